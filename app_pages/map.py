@@ -0,0 +1,12 @@
+import streamlit as st
+from housing.app import current_page
+
+page = current_page()
+
+with page.header:
+    # 应用标题
+    st.title("Housing Data App by YANLIN LIU")
+
+# 使用PyDeck显示房价的点图
+st.subheader("See more filters in the sidebar")
+page.map()
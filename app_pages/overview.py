@@ -0,0 +1,19 @@
+from housing.app import current_page
+from housing.charts import HIST_EDGES
+from housing.shell import page_shell, preview_cells
+
+page = current_page()
+
+# 页面外壳：Bootstrap 标题和卡片，样式文件在本地（housing/components/page_shell），iframe 只加载一次
+# 卡片里的摘要、直方图和地图缩略图只发这几十个数，不需要 matplotlib 和 pydeck
+selection = page.selection
+with page.timings.stage("page_shell"), page.header:
+    page_shell(
+        summary="%s income, %d location types, %d-%d: %d districts" % (
+            page.income_filter, len(page.location_filter), page.price_range[0], page.price_range[1], len(selection)),
+        histogram=page.histogram_counts(),
+        edges=HIST_EDGES,
+        cells=page.results.get(page.key, "preview", lambda: preview_cells(
+            selection.column("longitude"), selection.column("latitude"), selection.column("median_house_value"))),
+        height=1000,
+    )
@@ -0,0 +1,12 @@
+import streamlit as st
+from housing.app import current_page
+
+page = current_page()
+
+with page.header:
+    # 应用标题
+    st.title("Housing Data App by YANLIN LIU")
+
+# 绘制房价直方图
+st.subheader("House Price Distribution")
+page.histogram()
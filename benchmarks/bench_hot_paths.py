@@ -0,0 +1,171 @@
+"""EDA app 热点路径的基准测试，结果写成 JSON，便于在不同提交之间对比。
+
+    python benchmarks/bench_hot_paths.py                      # housing.csv 以及 10x/100x/1000x 的合成数据
+    python benchmarks/bench_hot_paths.py --scales 1,10 -o a.json
+    python benchmarks/compare.py old.json new.json
+
+合成数据由 synth_housing.py 生成，行数是 housing.csv 的 N 倍，分布与原数据相近。
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from housing.charts import histogram_counts, histogram_png, price_bins  # noqa: E402
+from housing.data import ingest_csv, load_housing  # noqa: E402
+from housing.filters import INCOME_LEVELS, BitmapIndex, PriceIndex, column, filter_rows, take  # noqa: E402
+from housing.map import aggregate_grid, cell_size, pack_points, scatter_deck  # noqa: E402
+from housing.query import MemoryEngine, ParquetEngine  # noqa: E402
+from housing.schema import apply_schema  # noqa: E402
+from housing.spatial import expand_bounds, stratified_sample  # noqa: E402
+from housing.tiles import load_pyramid, selected_groups, tiles_in_view, view_bounds  # noqa: E402
+from synth_housing import write_synthetic  # noqa: E402
+
+
+def timed(fn, repeat=5, min_time=0.05):
+    """重复执行 fn，返回每次耗时（毫秒）的统计；单次很快时自动多跑几轮。"""
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < repeat or (time.perf_counter() - started < min_time and len(samples) < 1000):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples = np.array(samples)
+    return {
+        "runs": len(samples),
+        "min_ms": float(samples.min()),
+        "median_ms": float(np.median(samples)),
+        "mean_ms": float(samples.mean()),
+    }
+
+
+def scaled_csv(csv_path, factor, folder, seed=0):
+    """factor 为 1 时复制原始 CSV，否则生成 factor 倍行数的合成 CSV。"""
+    path = os.path.join(folder, "housing_x%d.csv" % factor)
+    if factor == 1:
+        shutil.copyfile(csv_path, path)
+        return path
+    base = pd.read_csv(csv_path)
+    return write_synthetic(path, len(base) * factor, "csv", base, seed=seed)
+
+
+def bench_dataset(csv_path, repeat):
+    results = {}
+    raw_csv = lambda: apply_schema(pd.read_csv(csv_path))  # noqa: E731
+    results["load/csv"] = timed(raw_csv, repeat=1, min_time=0)
+    load_housing(csv_path)  # 写出列式缓存
+    results["load/cached"] = timed(lambda: load_housing(csv_path), repeat=repeat, min_time=0)
+    load_housing(csv_path, mmap=True)
+    results["load/mmap"] = timed(lambda: load_housing(csv_path, mmap=True), repeat=repeat, min_time=0)
+
+    data = load_housing(csv_path)
+    results["index/bitmap_build"] = timed(lambda: BitmapIndex(data), repeat=1, min_time=0)
+    results["index/price_build"] = timed(lambda: PriceIndex(data), repeat=1, min_time=0)
+    index = BitmapIndex(data)
+    price_index = PriceIndex(data)
+    bins = price_bins(data["median_house_value"].to_numpy())
+
+    # 侧边栏的每一种组合：收入档 x 位置类型的非空子集
+    categories = list(data["ocean_proximity"].cat.categories)
+    combos = [(level, subset) for level in INCOME_LEVELS
+              for k in range(1, len(categories) + 1) for subset in itertools.combinations(categories, k)]
+    for level, subset in combos:
+        name = "%s|%s" % (level, ",".join(subset))
+        results["filter/scan/" + name] = timed(lambda: filter_rows(data, level, list(subset)), repeat=repeat)
+        results["filter/bitmap/" + name] = timed(lambda: index.rows(level, subset), repeat=repeat)
+
+    mask = index.mask("Medium", categories)
+    low, high = price_index.bounds(mask)
+    prices = data["median_house_value"].to_numpy()
+    results["price/bounds/sorted"] = timed(lambda: price_index.bounds(mask), repeat=repeat)
+    results["price/bounds/scan"] = timed(lambda: (prices[mask].min(), prices[mask].max()), repeat=repeat)
+    for fraction in (0.01, 0.1, 0.5, 1.0):
+        top = low + (high - low) * fraction
+        results["price/sorted/%g" % fraction] = timed(lambda: price_index.rows(low, top, mask=mask), repeat=repeat)
+        results["price/scan/%g" % fraction] = timed(
+            lambda: np.flatnonzero(mask & (prices >= low) & (prices <= top)), repeat=repeat)
+
+    rows = price_index.rows(low, high, mask=mask)
+    lon, lat = column(data, "longitude", rows), column(data, "latitude", rows)
+    values = column(data, "median_house_value", rows)
+    center = (float(lon.mean()), float(lat.mean()))
+    results["map/pydeck_json"] = timed(
+        lambda: scatter_deck(take(data, rows, ["latitude", "longitude"]), center).to_json(), repeat=1, min_time=0)
+    results["map/binary_pack"] = timed(lambda: pack_points(lon, lat), repeat=repeat)
+    results["map/sample_50k"] = timed(lambda: stratified_sample(lon, lat, 50_000), repeat=repeat)
+    results["map/grid_z10"] = timed(lambda: aggregate_grid(lon, lat, values, cell_size(10)), repeat=repeat)
+    pyramid = load_pyramid(csv_path, data)
+    view = tiles_in_view(float(lon.mean()), float(lat.mean()), 10)
+    groups = selected_groups(data, "Medium", categories)
+    results["map/tiles_z10"] = timed(lambda: pyramid.query(10, view, groups), repeat=repeat)
+    engine = MemoryEngine(data)
+    covered = expand_bounds(view_bounds(float(lon.mean()), float(lat.mean()), 10), 0.5)
+    results["map/viewport_z10"] = timed(lambda: engine.select("Medium", categories, (low, high), bbox=covered), repeat=repeat)
+
+    results["histogram/bincount"] = timed(lambda: histogram_counts(bins, rows), repeat=repeat)
+    counts = histogram_counts(bins, rows)
+    results["histogram/png"] = timed(lambda: histogram_png(counts), repeat=3, min_time=0)
+
+    # 数据不在内存时：分块导入 Parquet，查询按 row group 统计跳过不匹配的块
+    results["query/ingest"] = timed(lambda: ingest_csv(csv_path), repeat=1, min_time=0)
+    store = ParquetEngine.open(csv_path)
+    results["query/parquet/medium_all"] = timed(
+        lambda: store.select("Medium", categories, (low, high)), repeat=repeat, min_time=0)
+    results["query/parquet/high_one"] = timed(
+        lambda: store.select("High", categories[:1], (low, low + (high - low) // 10)), repeat=repeat, min_time=0)
+    return len(data), results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--csv", default=os.path.join(ROOT, "housing.csv"))
+    parser.add_argument("--scales", default="1,10,100,1000", help="逗号分隔的放大倍数，1 表示原始 housing.csv")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("-o", "--output", help="默认写到 benchmarks/results-<commit>.json")
+    args = parser.parse_args(argv)
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.platform(),
+        "datasets": {},
+    }
+    with tempfile.TemporaryDirectory() as folder:
+        for factor in (int(s) for s in args.scales.split(",")):
+            print("x%d: writing csv" % factor, file=sys.stderr)
+            csv_path = scaled_csv(args.csv, factor, folder)
+            print("x%d: running" % factor, file=sys.stderr)
+            rows, results = bench_dataset(csv_path, args.repeat)
+            report["datasets"]["x%d" % factor] = {"rows": rows, "results": results}
+
+    output = args.output or os.path.join(ROOT, "benchmarks", "results-%s.json" % (commit or "local"))
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
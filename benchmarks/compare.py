@@ -0,0 +1,38 @@
+"""对比两次 bench_hot_paths.py 的结果：python benchmarks/compare.py old.json new.json"""
+import argparse
+import json
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=1.2, help="new/old 超过这个比例标记为变慢")
+    args = parser.parse_args(argv)
+
+    with open(args.old, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+
+    print("%s -> %s" % (old.get("commit"), new.get("commit")))
+    slower = 0
+    for dataset, entry in new["datasets"].items():
+        before = old["datasets"].get(dataset)
+        if before is None:
+            continue
+        print("\n[%s] %d rows" % (dataset, entry["rows"]))
+        for name, result in sorted(entry["results"].items()):
+            if name not in before["results"]:
+                continue
+            old_ms = before["results"][name]["median_ms"]
+            new_ms = result["median_ms"]
+            ratio = new_ms / old_ms if old_ms else float("inf")
+            flag = " SLOWER" if ratio > args.threshold else ""
+            slower += bool(flag)
+            print("  %-48s %10.3f -> %10.3f ms  x%.2f%s" % (name, old_ms, new_ms, ratio, flag))
+    return 1 if slower else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,195 @@
+"""用 Streamlit 的无头 AppTest 模拟多个并发会话，测一个进程能承受多少用户。
+
+    python benchmarks/load_test.py --sessions 8 --interactions 30
+    python benchmarks/load_test.py --pages app_pages/map.py --sessions 1,4,16 -o load.json
+
+每个会话是一个线程、一个独立的 AppTest，按随机轨迹操作侧边栏和滑块，并在 --pages 给出的页面之间切换；
+所有会话跑在同一个进程里，共享 st.cache_resource，和一个 Streamlit 服务进程的情况一致。
+报告每类操作的延迟分位数、吞吐量，以及进程 RSS 的增长。全程离线。
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def rss_bytes():
+    # Linux 下读 /proc/self/status 的 VmRSS，取不到时退回 ru_maxrss
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def widget(elements, label):
+    # 控件可能不在页面上：比如侧边栏的组合没有匹配的行时 st.stop()，价格滑块不会画出来
+    return next((w for w in elements if w.label == label), None)
+
+
+def change(at, rng, pages, kind):
+    """按 kind 改一个控件的值（或切换页面）；控件不在页面上时返回 False。"""
+    if kind == "page":
+        at.switch_page(rng.choice(pages))
+        return True
+    if kind in ("income", "map_mode"):
+        w = widget(at.radio, "Choose Income Level" if kind == "income" else "Map Mode")
+    elif kind == "location":
+        w = widget(at.multiselect, "Choose Location Type")
+    else:
+        w = widget(at.slider, "Minimal Median House Price" if kind == "price" else "Map Zoom")
+    if w is None:
+        return False
+    if kind in ("income", "map_mode"):
+        w.set_value(rng.choice(w.options))
+    elif kind == "location":
+        w.set_value(rng.sample(w.options, rng.randint(1, len(w.options))))
+    elif kind == "price":
+        a, b = sorted(rng.randint(int(w.min), int(w.max)) for _ in range(2))
+        w.set_value((a, b))
+    else:
+        w.set_value(rng.randint(int(w.min), int(w.max)))
+    return True
+
+
+def interaction(at, rng, pages):
+    """随机选一个控件并改它的值（或切换页面），返回操作名；选中的控件不在页面上就换一个，都不在时返回 None。"""
+    kinds = ["income", "location", "price", "price", "map_mode", "zoom"] + (["page"] if len(pages) > 1 else [])
+    while kinds:
+        kind = rng.choice(kinds)
+        if change(at, rng, pages, kind):
+            return kind
+        kinds = [k for k in kinds if k != kind]
+    return None
+
+
+def run_session(app_path, pages, interactions, seed, timeout, samples, errors, barrier):
+    """一个会话的随机轨迹；异常记进 errors，不让线程悄悄退出、少算的 rerun 影响吞吐量和延迟。"""
+    try:
+        rng = random.Random(seed)
+        at = AppTest.from_file(app_path, default_timeout=timeout)
+        if pages:
+            at.switch_page(pages[0])
+        barrier.wait()
+        start = time.perf_counter()
+        at.run()
+        samples.append(("initial", (time.perf_counter() - start) * 1000))
+        for _ in range(interactions):
+            kind = interaction(at, rng, pages)
+            if kind is None:
+                continue
+            start = time.perf_counter()
+            at.run()
+            samples.append((kind, (time.perf_counter() - start) * 1000))
+            if at.exception:
+                errors.append("%s: %s" % (kind, at.exception[0].value))
+    except Exception as exc:
+        errors.append("session %d: %s: %s" % (seed, type(exc).__name__, exc))
+        # 还没走到 barrier 就失败时不让其他线程一直等
+        barrier.abort()
+
+
+def load_test(app_path, pages, sessions, interactions, seed, timeout):
+    samples, errors = [], []
+    barrier = threading.Barrier(sessions + 1)
+    rss_trace = []
+    done = threading.Event()
+
+    def watch_rss():
+        while not done.is_set():
+            rss_trace.append(rss_bytes())
+            done.wait(0.1)
+
+    threads = [
+        threading.Thread(target=run_session, args=(app_path, pages, interactions, seed + i, timeout, samples, errors, barrier))
+        for i in range(sessions)
+    ]
+    for thread in threads:
+        thread.start()
+    rss_before = rss_bytes()
+    watcher = threading.Thread(target=watch_rss)
+    watcher.start()
+    started = time.perf_counter()
+    try:
+        barrier.wait()
+    except threading.BrokenBarrierError:
+        # 有会话在开始前就失败了，错误已经记在 errors 里
+        pass
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    watcher.join()
+
+    by_kind = {}
+    for kind, ms in samples:
+        by_kind.setdefault(kind, []).append(ms)
+    by_kind["all"] = [ms for kind, ms in samples if kind != "initial"]
+    latency = {}
+    for kind, values in sorted(by_kind.items()):
+        if not values:
+            continue
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        latency[kind] = {"count": len(values), "p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "max_ms": max(values)}
+    return {
+        "sessions": sessions,
+        "interactions_per_session": interactions,
+        "elapsed_s": elapsed,
+        "throughput_reruns_per_s": len(samples) / elapsed,
+        "latency": latency,
+        "rss_before_mb": rss_before / 2 ** 20,
+        "rss_peak_mb": max(rss_trace + [rss_before]) / 2 ** 20,
+        "rss_after_mb": rss_bytes() / 2 ** 20,
+        "error_count": len(errors),
+        "errors": errors[:20],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default="eda-app.py")
+    parser.add_argument("--pages", default="app_pages/overview.py,app_pages/map.py,app_pages/prices.py",
+                        help="逗号分隔，相对 app 所在目录；会话从第一个页面开始，之后随机切换")
+    parser.add_argument("--sessions", default="1,4,8", help="逗号分隔，依次测试的并发会话数")
+    parser.add_argument("--interactions", type=int, default=20, help="每个会话的操作次数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120, help="单次 rerun 的超时（秒）")
+    parser.add_argument("-o", "--output")
+    args = parser.parse_args(argv)
+
+    # 和 streamlit run 一样，在 app 所在目录运行，相对路径的 housing.csv 才能找到
+    app_path = os.path.abspath(os.path.join(ROOT, args.app))
+    os.chdir(os.path.dirname(app_path))
+    sys.path.insert(0, os.path.dirname(app_path))
+
+    pages = [page for page in args.pages.split(",") if page]
+    report = {"app": args.app, "pages": pages, "runs": []}
+    for sessions in (int(s) for s in args.sessions.split(",")):
+        result = load_test(app_path, pages, sessions, args.interactions, args.seed, args.timeout)
+        report["runs"].append(result)
+        overall = result["latency"]["all"]
+        print("%3d sessions: %6.1f reruns/s  p50 %7.1f ms  p95 %7.1f ms  p99 %7.1f ms  rss %.0f -> %.0f MB (peak %.0f)%s" % (
+            sessions, result["throughput_reruns_per_s"], overall["p50_ms"], overall["p95_ms"], overall["p99_ms"],
+            result["rss_before_mb"], result["rss_after_mb"], result["rss_peak_mb"],
+            "  %d errors" % result["error_count"] if result["error_count"] else ""))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""生成与 housing.csv 统计特征相近的合成街区数据，用于规模测试。
+
+    python benchmarks/synth_housing.py --rows 1000000 -o housing_1m.csv
+    python benchmarks/synth_housing.py --rows 100000000 --format parquet -o housing_100m.parquet
+
+均匀抽取 housing.csv 中的行作为模板（各 ocean_proximity 类别的比例因此不变），再加扰动：
+经纬度加抖动；户数按对数正态缩放，房间数/卧室数/人口随之等比缩放（保持比例关系）；
+收入和房价按对数正态扰动，并保留原数据在 500001 的截断；total_bedrooms 按原比例缺失。
+数据按块生成、按块写出，内存占用只取决于 --chunk-size。
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from housing.schema import apply_schema  # noqa: E402
+
+FORMATS = ("csv", "parquet", "feather")
+PRICE_CAP = 500001
+
+
+def generate_chunk(base, rows, rng, missing_rate):
+    # 均匀抽模板行，各 ocean_proximity 类别的比例自然与原数据一致
+    template = base.iloc[rng.integers(0, len(base), rows)].reset_index(drop=True)
+
+    scale = rng.lognormal(0.0, 0.25, rows)
+
+    def scaled(name, spread):
+        values = template[name].to_numpy() * scale * rng.lognormal(0.0, spread, rows)
+        return np.maximum(np.round(values), 1)
+
+    price = template["median_house_value"].to_numpy()
+    capped = price >= PRICE_CAP
+    price = np.clip(np.round(price * rng.lognormal(0.0, 0.08, rows), -2), 14999, PRICE_CAP)
+    price[capped] = PRICE_CAP
+
+    chunk = pd.DataFrame({
+        "longitude": np.round(template["longitude"].to_numpy() + rng.normal(0, 0.02, rows), 2),
+        "latitude": np.round(template["latitude"].to_numpy() + rng.normal(0, 0.02, rows), 2),
+        "housing_median_age": np.clip(np.round(template["housing_median_age"].to_numpy() + rng.normal(0, 2, rows)), 1, 52),
+        "total_rooms": scaled("total_rooms", 0.05),
+        "total_bedrooms": scaled("total_bedrooms", 0.05),
+        "population": scaled("population", 0.08),
+        "households": np.maximum(np.round(template["households"].to_numpy() * scale), 1),
+        "median_income": np.clip(np.round(template["median_income"].to_numpy() * rng.lognormal(0.0, 0.1, rows), 4),
+                                 0.4999, 15.0001),
+        "median_house_value": price,
+        "ocean_proximity": template["ocean_proximity"].to_numpy(),
+    })
+    missing = rng.random(rows) < missing_rate
+    chunk.loc[missing, "total_bedrooms"] = np.nan
+    return chunk
+
+
+def generate(base, rows, chunk_size=1_000_000, seed=0):
+    """逐块产出合成数据（已按 SCHEMA 转换类型）。"""
+    rng = np.random.default_rng(seed)
+    missing_rate = base["total_bedrooms"].isna().mean()
+    base = base.dropna(subset=["total_bedrooms"]).reset_index(drop=True)
+    remaining = rows
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        yield apply_schema(generate_chunk(base, size, rng, missing_rate))
+        remaining -= size
+
+
+def write_synthetic(path, rows, fmt=None, base=None, chunk_size=1_000_000, seed=0):
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".") or "csv"
+    if fmt not in FORMATS:
+        raise ValueError("unknown format %r, expected one of %s" % (fmt, ", ".join(FORMATS)))
+    if base is None:
+        base = pd.read_csv(os.path.join(ROOT, "housing.csv"))
+    chunks = generate(base, rows, chunk_size, seed)
+
+    if fmt == "csv":
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            for i, chunk in enumerate(chunks):
+                chunk.to_csv(f, index=False, header=i == 0)
+        return path
+
+    import pyarrow as pa
+
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                if fmt == "parquet":
+                    import pyarrow.parquet as pq
+
+                    writer = pq.ParquetWriter(path, table.schema)
+                else:
+                    writer = pa.ipc.new_file(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=FORMATS, help="默认按输出文件的扩展名判断")
+    parser.add_argument("--chunk-size", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--base", default=os.path.join(ROOT, "housing.csv"), help="用来拟合分布的原始数据")
+    parser.add_argument("-o", "--output", required=True)
+    args = parser.parse_args(argv)
+
+    write_synthetic(args.output, args.rows, args.format, pd.read_csv(args.base), args.chunk_size, args.seed)
+    print(args.output)
+
+
+if __name__ == "__main__":
+    main()
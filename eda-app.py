@@ -0,0 +1,34 @@
+import streamlit as st
+from housing.app import HousingPage
+from housing.shell import shell_price_default
+from housing.theme import stylesheet_html
+
+# 样式表的 <link>（带内容哈希），进程内算一次
+@st.cache_resource
+def load_theme():
+    return stylesheet_html()
+
+# 多页面应用：原来的两个版本合在一起。侧边栏和价格滑块在这里画，所有页面共用，切换页面时保留
+# 各页面只在打开时才导入自己用到的库：地图页才加载 pydeck，直方图页才加载 matplotlib/seaborn
+page = HousingPage("eda-app")
+
+# 应用的CSS样式：样式表是 static/housing.css，每次 rerun 只发一行 <link>，内容由浏览器缓存
+with page.timings.stage("theme"):
+    st.markdown(load_theme(), unsafe_allow_html=True)
+
+navigation = st.navigation([
+    st.Page("app_pages/overview.py", title="Overview", default=True),
+    st.Page("app_pages/map.py", title="Map"),
+    st.Page("app_pages/prices.py", title="Price Distribution"),
+])
+page.timings.context.update(page=navigation.url_path or "overview")
+
+# 页面的标题画在滑块上面
+page.header = st.container()
+page.sidebar()
+
+# 主体内容：房价滑块，在概览页的直方图上点过的价格段作为默认值
+page.price_slider(shell_price_default(page.sidebar_key, page.price_min, page.price_max))
+
+navigation.run()
+page.finish()
@@ -0,0 +1,9 @@
+"""EDA 应用共用的核心包：数据、筛选、地图和图表各是一个模块。
+
+- 数据层：schema（列类型）、data（CSV 的列式缓存、mmap、分块导入 Parquet）、query（内存/Parquet 两种查询引擎）
+- 筛选：filters（位图索引和有序价格索引）、spatial（Hilbert 排序、网格索引、分层抽样）、cache（结果缓存）
+- 地图：map（pydeck 和二进制点图组件）、tiles（瓦片金字塔）
+- 图表和页面：charts（直方图）、shell（页面外壳组件）、theme（样式表）、profile（分阶段计时）、app（页面流程）
+
+这里不导入任何子模块：数据层和筛选不依赖 Streamlit，单独用（基准测试、导入脚本）时不会把页面相关的库带进来。
+"""
@@ -0,0 +1,229 @@
+"""多页面应用（eda-app.py 和 app_pages/ 下的各页）共用的页面逻辑。
+
+数据层（housing.data / housing.query）、筛选（housing.filters）、地图（housing.map / housing.tiles）
+和图表（housing.charts）都在各自的模块里；这里把它们按页面的顺序串起来：缓存的加载函数、侧边栏、
+价格滑块、地图、直方图和调试面板。缓存、索引和计时的改进所有页面同时生效。
+
+入口先建 HousingPage、画侧边栏和滑块，再运行当前页面；页面脚本用 current_page() 取到同一个
+HousingPage，只画自己的那部分。瓦片金字塔和全量点只在地图页第一次打开时加载。
+"""
+import os
+import threading
+
+import numpy as np
+import streamlit as st
+
+from housing.cache import ResultCache, filter_key
+from housing.charts import histogram_png
+from housing.filters import INCOME_LEVELS
+from housing.map import (MAP_BASE_LIMIT, MAP_MODES, MAP_POINT_BUDGET, aggregate_grid, base_points, binary_scatter,
+                         cell_size, grid_deck, masked_scatter, pack_points, sample_caption, sample_points, scatter_deck,
+                         viewport)
+from housing.profile import Profiler, configure_logging
+from housing.query import open_engine
+from housing.tiles import TilePyramid, load_pyramid, selected_groups, tiles_in_view
+
+CSV_PATH = "housing.csv"
+# 每个会话的脚本在自己的线程里运行，页面脚本在入口的同一次运行里执行
+_current = threading.local()
+
+
+# 加载数据，使用st.cache_resource缓存：数据只读，每次rerun不再复制一份
+# 冷启动时优先读 .housing_cache 里的列式缓存；HOUSING_MMAP=1 时各进程共享内存映射
+# HOUSING_STORE=parquet 时数据不读进内存，筛选下推到分块导入的 Parquet
+@st.cache_resource
+def load_engine():
+    return open_engine(CSV_PATH, store=os.environ.get("HOUSING_STORE"),
+                       mmap=os.environ.get("HOUSING_MMAP") == "1")
+
+
+# 各缩放级别的瓦片金字塔，加载时建好并存进 .housing_cache；数据不在内存时不建
+@st.cache_resource
+def load_tiles():
+    engine = load_engine()
+    return load_pyramid(CSV_PATH, engine.data) if engine.in_memory else None
+
+
+# 全量点的经纬度打包一次，"Points (binary)" 只在组件加载时发送它，之后只发掩码
+@st.cache_resource
+def load_map_base():
+    engine = load_engine()
+    if not engine.in_memory or len(engine.data) > MAP_BASE_LIMIT:
+        return None
+    lon, lat = engine.data["longitude"].to_numpy(), engine.data["latitude"].to_numpy()
+    # mmap 模式下打包好的经纬度也存进缓存目录，各进程共享
+    packed = engine.persist("map_base", lambda: {"positions": np.frombuffer(pack_points(lon, lat), dtype=np.uint8)})
+    return base_points(packed["positions"])
+
+
+# 筛选结果按控件状态缓存，所有会话共用；HOUSING_RESULT_CACHE_MB 设置内存上限
+@st.cache_resource
+def load_result_cache():
+    return ResultCache(max_bytes=int(os.environ.get("HOUSING_RESULT_CACHE_MB", "256")) << 20)
+
+
+# 每次 rerun 的分阶段计时，进程内共用；HOUSING_PROFILE_LOG 设置结构化日志的输出位置
+@st.cache_resource
+def load_profiler():
+    configure_logging()
+    return Profiler()
+
+
+class HousingPage:
+    """一次 rerun 的页面状态；各个方法按页面从上到下的顺序调用，后面的步骤用前面的结果。"""
+
+    def __init__(self, app):
+        _current.page = self
+        # 多页面时由入口放一个 st.container()，页面把标题画在滑块上面
+        self.header = None
+        self.profiler = load_profiler()
+        self.timings = self.profiler.rerun(app=app)
+        with self.timings.stage("load_data"):
+            self.engine = load_engine()
+            self.results = load_result_cache()
+
+    def sidebar(self):
+        # 侧边栏：多选框选择位置类型和收入水平过滤
+        st.sidebar.header("Filter Options")
+        location_types = self.engine.categories
+        self.location_filter = st.sidebar.multiselect(
+            "Choose Location Type", options=location_types, default=location_types)
+
+        self.income_filter = st.sidebar.radio(
+            "Choose Income Level",
+            INCOME_LEVELS,
+            index=1
+        )
+
+        # 地图模式：逐点绘制（全部或只发视野附近的点），在服务端按当前缩放级别的网格聚合，或只取视野内的预聚合瓦片
+        self.map_mode = st.sidebar.radio("Map Mode", MAP_MODES, index=0)
+        self.map_zoom = st.sidebar.slider("Map Zoom", 4, 14, 10)
+        # 逐点模式最多画的点数，超过就按格子分层抽样；HOUSING_MAP_POINTS 可以修改
+        self.map_budget = int(os.environ.get("HOUSING_MAP_POINTS", MAP_POINT_BUDGET))
+
+        # 根据收入水平和位置类型得到价格滑块的上下限，怎么查由引擎决定
+        with self.timings.stage("filters"):
+            self.sidebar_key = filter_key(self.income_filter, self.location_filter)
+            bounds = self.results.get(
+                self.sidebar_key, "price_range", lambda: self.engine.bounds(self.income_filter, self.location_filter))
+        # 没有匹配的行（比如位置类型全取消了）时 bounds 是 None，页面到这里为止
+        if bounds is None:
+            st.info("No districts match the selected income level and location types.")
+            self.timings.finish()
+            st.stop()
+        self.price_min, self.price_max = bounds
+
+    def price_slider(self, default=None):
+        """房价滑块，default 不给时是整个范围；随后按滑块的区间筛选。"""
+        if self.price_min == self.price_max:
+            # 只有一个价格时滑块的范围宽度为 0，st.slider 不接受；不画滑块，结果照常显示
+            self.price_range = (self.price_min, self.price_max)
+            st.caption("All matching districts have the same median house value (%d)." % self.price_min)
+        else:
+            self.price_range = st.slider(
+                "Minimal Median House Price",
+                self.price_min,
+                self.price_max,
+                default or (self.price_min, self.price_max)
+            )
+
+        # 按滑块的价格区间筛选：内存里是行号，不复制数据；Parquet 只读可能匹配的 row group 和地图用到的列
+        with self.timings.stage("price_filter"):
+            self.key = filter_key(self.income_filter, self.location_filter, self.price_range)
+            self.selection = self.results.get(self.key, "selection", lambda: self.engine.select(
+                self.income_filter, self.location_filter, self.price_range))
+        self.timings.context.update(income=self.income_filter, locations=len(self.location_filter),
+                                    map_mode=self.map_mode, rows=len(self.selection))
+
+    def center(self):
+        """筛选结果的中心；没有匹配的行时用全量数据的中心，不让 NaN 进到瓦片和视野的计算里。"""
+        selection = self.selection
+        if not len(selection):
+            return self.engine.center
+        return self.results.get(self.key, "center", lambda: (
+            float(selection.column("longitude").mean()), float(selection.column("latitude").mean())))
+
+    def map(self):
+        # 使用PyDeck显示房价的点图，只取出地图用到的列
+        results, key, selection = self.results, self.key, self.selection
+        map_mode, map_zoom, map_budget = self.map_mode, self.map_zoom, self.map_budget
+        with self.timings.stage("map"):
+            tiles, map_base = load_tiles(), load_map_base()
+            if map_mode == "Aggregated":
+                size = cell_size(map_zoom)
+                cells = results.get(key, ("grid", map_zoom), lambda: aggregate_grid(
+                    selection.column("longitude"), selection.column("latitude"),
+                    selection.column("median_house_value"), size))
+                st.pydeck_chart(grid_deck(cells, size, self.center(), map_zoom))
+            elif map_mode == "Tiles":
+                center = self.center()
+                view = tiles_in_view(center[0], center[1], map_zoom)
+                if tiles is not None and tuple(self.price_range) == (self.price_min, self.price_max):
+                    # 价格是全范围时，侧边栏的组合直接在全量金字塔里按分组相加
+                    groups = selected_groups(self.engine.data, self.income_filter, self.location_filter)
+                    cells = results.get(key, ("tiles", map_zoom), lambda: tiles.query(map_zoom, view, groups))
+                else:
+                    # 否则只为筛选后的行建这一级瓦片，并按筛选条件缓存
+                    level = results.get(key, ("tile_level", map_zoom), lambda: TilePyramid(source=(
+                        selection.column("longitude"), selection.column("latitude"),
+                        selection.column("median_house_value"), None)).level(map_zoom))
+                    cells = results.get(key, ("tiles", map_zoom),
+                                        lambda: TilePyramid({map_zoom: level}).query(map_zoom, view))
+                st.pydeck_chart(grid_deck(cells, cell_size(map_zoom), center, map_zoom))
+                st.caption("%d x %d tiles in view, %d cells" % (
+                    view[1] - view[0] + 1, view[3] - view[2] + 1, len(cells)))
+            elif map_mode == "Points (binary)":
+                # 经纬度以 float32 二进制数组发送，不生成逐行的 JSON
+                sampled = results.get(key, "sample", lambda: sample_points(selection, map_budget))
+                if map_base is not None:
+                    # 组件已有全量点时只发位图掩码，图层不重建，位置缓冲区也不重新上传
+                    masked_scatter(map_base, sampled.rows, self.center(), st.session_state.get("binary_points"),
+                                   map_zoom, key="binary_points")
+                else:
+                    binary_scatter(sampled.column("longitude"), sampled.column("latitude"), self.center(), map_zoom,
+                                   key="binary_points")
+                if len(sampled) < len(selection):
+                    st.caption(sample_caption(len(sampled), len(selection)))
+            elif map_mode == "Points (viewport)":
+                # 只发送视野附近的点：网格索引取出范围内的行，再判断其余筛选条件；平移/缩放出了范围组件才触发 rerun
+                view, covered = viewport(st.session_state.get("viewport_points"), self.center(), map_zoom)
+                visible = results.get(key, ("viewport", covered), lambda: self.engine.select(
+                    self.income_filter, self.location_filter, self.price_range, bbox=covered))
+                sampled = results.get(key, ("viewport_sample", covered), lambda: sample_points(visible, map_budget))
+                binary_scatter(sampled.column("longitude"), sampled.column("latitude"), self.center(), map_zoom,
+                               key="viewport_points", view=view, covered=covered)
+                st.caption("%d of %d points near the view" % (len(visible), len(selection)))
+                if len(sampled) < len(visible):
+                    st.caption(sample_caption(len(sampled), len(visible)))
+            else:
+                sampled = results.get(key, "sample", lambda: sample_points(selection, map_budget))
+                points = results.get(key, "points", lambda: sampled.frame(["latitude", "longitude"]))
+                st.pydeck_chart(scatter_deck(points, self.center(), map_zoom))
+                if len(sampled) < len(selection):
+                    st.caption(sample_caption(len(sampled), len(selection)))
+
+    def histogram_counts(self):
+        return self.results.get(self.key, "histogram_counts", self.selection.histogram_counts)
+
+    def histogram(self):
+        """绘制房价直方图，返回 30 个计数。"""
+        # 计数来自预先算好的分箱；同样的 30 个计数只画一次图
+        with self.timings.stage("histogram"):
+            counts = self.histogram_counts()
+            histogram = self.results.get(("histogram", counts.tobytes()), "png", lambda: histogram_png(counts))
+            st.image(histogram, width="stretch")
+        return counts
+
+    def finish(self):
+        self.timings.finish()
+
+        # 调试面板：URL 带 ?debug=1 或设置 HOUSING_DEBUG=1 时显示各阶段耗时和结果缓存的命中情况
+        if st.query_params.get("debug") == "1" or os.environ.get("HOUSING_DEBUG") == "1":
+            with st.sidebar.expander("Timings", expanded=True):
+                st.dataframe(self.profiler.summary(), hide_index=True)
+                st.json(self.results.stats())
+
+
+def current_page():
+    """当前这次运行的 HousingPage（页面脚本里用）。"""
+    return _current.page
@@ -0,0 +1,91 @@
+"""筛选结果的 LRU 缓存：按完整的控件状态缓存行号和由它派生的地图、直方图数据。
+
+进程内共享（放在 st.cache_resource 里），不同会话切到同一组筛选条件时也能命中。
+缓存的值会被多个会话同时读取，不能原地修改。
+"""
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def filter_key(income_level, locations, price_range=None):
+    # 多选框的顺序不影响结果，排序后作为键
+    key = (income_level, tuple(sorted(locations)))
+    if price_range is not None:
+        key += (tuple(int(p) for p in price_range),)
+    return key
+
+
+def sizeof(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(deep=True)))
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value.values())
+    # 自己知道大小的对象（如查询结果 Selection）
+    nbytes = getattr(value, "nbytes", None)
+    if nbytes is not None:
+        return nbytes
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    def __init__(self, max_bytes=256 << 20):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, name, compute):
+        """取 (key, name) 对应的结果，没有就调用 compute() 计算并放入缓存。"""
+        item_key = (key, name)
+        with self._lock:
+            if item_key in self._items:
+                self._items.move_to_end(item_key)
+                self.hits += 1
+                return self._items[item_key][0]
+            self.misses += 1
+
+        # 计算放在锁外，慢的计算不会挡住其他会话
+        value = compute()
+        size = sizeof(value)
+        if size > self.max_bytes:
+            return value
+        with self._lock:
+            if item_key not in self._items:
+                self._items[item_key] = (value, size)
+                self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted_size) = self._items.popitem(last=False)
+                self.nbytes -= evicted_size
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._items),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,52 @@
+"""房价直方图：分箱在加载时算好，每次筛选只对行号做一次 bincount。
+
+PNG 按 30 个计数缓存；每张图是独立的 Figure，不经过 pyplot，多线程同时画图互不影响。matplotlib 和 seaborn 在第一次画图时才导入，
+只用到分箱和计数的页面（以及查询层）不用为它们付出启动时间。
+"""
+import io
+from functools import lru_cache
+
+import numpy as np
+
+HIST_BINS = 30
+HIST_RANGE = (200000, 500001)
+HIST_EDGES = np.linspace(HIST_RANGE[0], HIST_RANGE[1], HIST_BINS + 1)
+
+
+def price_bins(prices):
+    """每行所在的分箱编号，规则与 plt.hist / np.histogram 相同；范围外为 -1。"""
+    prices = np.asarray(prices)
+    bins = np.searchsorted(HIST_EDGES, prices, side="right") - 1
+    # 最后一个分箱包含右端点
+    bins[prices == HIST_RANGE[1]] = HIST_BINS - 1
+    bins[(prices < HIST_RANGE[0]) | (prices > HIST_RANGE[1])] = -1
+    return bins.astype(np.int8)
+
+
+def histogram_counts(bins, rows):
+    selected = bins[rows]
+    return np.bincount(selected[selected >= 0], minlength=HIST_BINS)
+
+
+@lru_cache(maxsize=None)
+def _figure_class():
+    # 只在第一次画图时导入并设置一次样式（seaborn 的样式改的是全局 rcParams，只在这里设置一次）
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
+    sns.set()
+    return Figure
+
+
+def histogram_png(counts):
+    # 不经过 pyplot：pyplot 的"当前 figure"是全局的，并发的会话会画到彼此的图上
+    fig = _figure_class()(figsize=(8, 6))
+    ax = fig.add_subplot()
+    ax.bar(HIST_EDGES[:-1], counts, width=np.diff(HIST_EDGES), align="edge", edgecolor='steelblue')
+    # median_house_value=500001有900多个样本
+    ax.set_xlabel("Median House Value")
+    ax.set_ylabel("Frequency")
+    buffer = io.BytesIO()
+    # 与 st.pyplot 的默认导出参数一致
+    fig.savefig(buffer, format="png", bbox_inches="tight", dpi=200)
+    return buffer.getvalue()
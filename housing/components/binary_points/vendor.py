@@ -0,0 +1,61 @@
+"""把二进制点图用到的 deck.gl 复制到 vendor/，文件名带内容哈希，并更新 index.html 里的引用。
+
+    pip download --no-deps panel==1.9.4 && unzip -o panel-1.9.4-*.whl 'panel/dist/*' -d /tmp/panel
+    python housing/components/binary_points/vendor.py /tmp/panel
+
+panel 的 wheel 里带着离线用的 deck.gl 完整打包（UMD，全局变量 deck），版本固定为 DECK_VERSION；
+不必安装 panel 本身，解开 dist/ 就够了。和 page_shell/vendor.py 一样，内容变了文件名才会变。
+"""
+import hashlib
+import os
+import re
+import shutil
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+VENDOR_DIR = os.path.join(HERE, "vendor")
+DECK_VERSION = "9.1.14"
+
+# 逻辑文件名 -> panel 包内的路径
+ASSETS = {
+    "deck.min.js": "panel/dist/bundled/deckglplot/deck.gl@%s/dist.min.js" % DECK_VERSION,
+}
+
+
+def hashed_name(name, data):
+    stem, ext = name.rsplit(".", 1)
+    return "%s.%s.%s" % (stem, hashlib.sha256(data).hexdigest()[:10], ext)
+
+
+def vendor(name, source):
+    with open(source, "rb") as f:
+        data = f.read()
+    target = hashed_name(name, data)
+    stem, ext = name.rsplit(".", 1)
+    pattern = re.compile(r"^%s\.[0-9a-f]{10}\.%s$" % (re.escape(stem), re.escape(ext)))
+    # 旧版本的文件删掉，只留当前引用的这一份
+    for old in os.listdir(VENDOR_DIR):
+        if pattern.match(old) and old != target:
+            os.remove(os.path.join(VENDOR_DIR, old))
+    with open(os.path.join(VENDOR_DIR, target), "wb") as f:
+        f.write(data)
+    return pattern, target
+
+
+def main(root):
+    os.makedirs(VENDOR_DIR, exist_ok=True)
+    index_path = os.path.join(HERE, "index.html")
+    with open(index_path, encoding="utf-8") as f:
+        html = f.read()
+    for name, path in ASSETS.items():
+        pattern, target = vendor(name, os.path.join(root, path))
+        html = re.sub(r"vendor/" + pattern.pattern.strip("^$"), "vendor/" + target, html)
+        print("vendor/" + target)
+    tmp = index_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(html)
+    shutil.move(tmp, index_path)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
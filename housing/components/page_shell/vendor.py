@@ -0,0 +1,59 @@
+"""把页面外壳用到的第三方前端文件复制到 vendor/，文件名带内容哈希，并更新 index.html 里的引用。
+
+    pip install XStatic-Bootstrap==4.5.3.1
+    python housing/components/page_shell/vendor.py
+
+文件内容变了文件名才会变，浏览器和代理可以放心地长期缓存 vendor/ 下的文件。
+"""
+import hashlib
+import importlib
+import os
+import re
+import shutil
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+VENDOR_DIR = os.path.join(HERE, "vendor")
+
+# 逻辑文件名 -> (XStatic 包, 包内路径)
+ASSETS = {
+    "bootstrap.min.css": ("xstatic.pkg.bootstrap", "css/bootstrap.min.css"),
+}
+
+
+def hashed_name(name, data):
+    stem, ext = name.rsplit(".", 1)
+    return "%s.%s.%s" % (stem, hashlib.sha256(data).hexdigest()[:10], ext)
+
+
+def vendor(name, package, path):
+    with open(os.path.join(importlib.import_module(package).BASE_DIR, path), "rb") as f:
+        data = f.read()
+    target = hashed_name(name, data)
+    stem, ext = name.rsplit(".", 1)
+    pattern = re.compile(r"^%s\.[0-9a-f]{10}\.%s$" % (re.escape(stem), re.escape(ext)))
+    # 旧版本的文件删掉，只留当前引用的这一份
+    for old in os.listdir(VENDOR_DIR):
+        if pattern.match(old) and old != target:
+            os.remove(os.path.join(VENDOR_DIR, old))
+    with open(os.path.join(VENDOR_DIR, target), "wb") as f:
+        f.write(data)
+    return pattern, target
+
+
+def main():
+    os.makedirs(VENDOR_DIR, exist_ok=True)
+    index_path = os.path.join(HERE, "index.html")
+    with open(index_path, encoding="utf-8") as f:
+        html = f.read()
+    for name, (package, path) in ASSETS.items():
+        pattern, target = vendor(name, package, path)
+        html = re.sub(r"vendor/" + pattern.pattern.strip("^$"), "vendor/" + target, html)
+        print("vendor/" + target)
+    tmp = index_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(html)
+    shutil.move(tmp, index_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""housing.csv 的加载：首次读取 CSV 后写一份列式（Feather）缓存，之后优先读缓存。
+
+mmap 模式下另外写一份按列的 .npy 文件，用 np.load(mmap_mode="r") 打开，
+同一台机器上的多个 Streamlit 进程共享同一份物理页；加载时建的索引等派生数组也一样（derived_arrays）。
+缓存里的行按经纬度的 Hilbert 曲线排序（见 housing.spatial），地理上相邻的街区在文件里也相邻。
+
+比内存还大的 CSV 用 ingest_csv 分块导入 Parquet，内存占用只取决于分块大小。
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from housing.filters import INCOME_LEVELS, income_bands
+from housing.schema import apply_schema
+from housing.spatial import hilbert_key, spatial_sort
+
+# 缓存文件放在 CSV 同目录下的隐藏文件夹里
+CACHE_DIR_NAME = ".housing_cache"
+# 缓存格式或 schema 变化时递增，旧缓存会自动失效
+CACHE_VERSION = 5
+# Parquet 存储每个 row group 的行数；块内按位置类型、收入档、Hilbert 键排序，row group 的 min/max 统计才有区分度
+ROW_GROUP_SIZE = 65_536
+
+
+def _cache_paths(csv_path):
+    folder = os.path.join(os.path.dirname(os.path.abspath(csv_path)), CACHE_DIR_NAME)
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return folder, os.path.join(folder, stem + ".feather"), os.path.join(folder, stem + ".meta.json")
+
+
+def cache_file(csv_path, suffix):
+    # 其他派生数据（瓦片等）也放在同一个缓存目录里
+    folder, _, _ = _cache_paths(csv_path)
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(folder, stem + suffix)
+
+
+def _columns_dir(csv_path):
+    return cache_file(csv_path, ".columns")
+
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path, write):
+    # 先写临时文件再替换，多个进程同时冷启动时不会读到写了一半的文件
+    tmp_path = "%s.%d.tmp" % (path, os.getpid())
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def cache_is_fresh(csv_path, meta, meta_path=None):
+    """缓存的 size/mtime 与 CSV 一致即视为新鲜；只有 mtime 变了时再比较哈希。
+
+    给了 meta_path 时，内容没变只是 touch 过就把新的 mtime 写回 meta，之后的检查（包括其他进程）不用再算哈希。
+    """
+    if not meta or meta.get("version") != CACHE_VERSION:
+        return False
+    stat = os.stat(csv_path)
+    if meta.get("size") != stat.st_size:
+        return False
+    if meta.get("mtime_ns") == stat.st_mtime_ns:
+        return True
+    if meta.get("sha256") != file_sha256(csv_path):
+        return False
+    if meta_path is not None:
+        # 用算哈希之前取的 mtime：哈希之后文件又被改过，mtime 对不上，下次还会重新比较
+        try:
+            _dump_json(meta_path, dict(meta, mtime_ns=stat.st_mtime_ns))
+        except OSError:
+            pass
+    return True
+
+
+def cached_sha256(csv_path):
+    """列式缓存仍然新鲜时返回 CSV 的哈希，派生数据用它判断是否过期。"""
+    _, _, meta_path = _cache_paths(csv_path)
+    meta = _read_meta(meta_path)
+    return meta["sha256"] if cache_is_fresh(csv_path, meta, meta_path) else None
+
+
+def source_stat(csv_path):
+    """CSV 的 size/mtime/哈希；要在解析 CSV 之前取，解析期间文件被替换时 meta 描述的是旧内容，下次检查会判为过期。"""
+    stat = os.stat(csv_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": file_sha256(csv_path)}
+
+
+def _write_meta(csv_path, meta_path, source, rows, **extra):
+    meta = {"version": CACHE_VERSION, "source": os.path.basename(csv_path), "rows": rows}
+    meta.update(source)
+    meta.update(extra)
+    _dump_json(meta_path, meta)
+    return meta
+
+
+def write_cache(csv_path, data, source, categories):
+    """source 是读 CSV 之前取的 source_stat，categories 是 ocean_proximity 在 CSV 里第一次出现的顺序。"""
+    folder, feather_path, meta_path = _cache_paths(csv_path)
+    os.makedirs(folder, exist_ok=True)
+    _write_atomic(feather_path, lambda p: data.to_feather(p))
+    # meta 最后写，读到 meta 就说明 feather 已经完整
+    return _write_meta(csv_path, meta_path, source, len(data), categories=categories)
+
+
+def source_categories(csv_path):
+    """ocean_proximity 各类别在 CSV 里第一次出现的顺序，侧边栏按它排列。
+
+    缓存的行按 Hilbert 曲线排过序，从数据上已经看不出原来的顺序，所以读 CSV 时记在 meta 里；没有 meta 时返回 None。
+    """
+    _, _, meta_path = _cache_paths(csv_path)
+    meta = _read_meta(meta_path)
+    return meta.get("categories") if meta else None
+
+
+def _save_npy(path, array):
+    def dump(p):
+        with open(p, "wb") as f:
+            np.save(f, np.ascontiguousarray(array))
+
+    _write_atomic(path, dump)
+
+
+def _dump_json(path, value):
+    def dump(p):
+        with open(p, "w", encoding="utf-8") as f:
+            json.dump(value, f, indent=2)
+
+    _write_atomic(path, dump)
+
+
+def write_columns(csv_path, data, sha256):
+    """每列一个 .npy；类别列存成编码 + 类别表，可空整数列另存一个缺失值掩码。"""
+    columns_dir = _columns_dir(csv_path)
+    os.makedirs(columns_dir, exist_ok=True)
+    layout = {"version": CACHE_VERSION, "sha256": sha256, "columns": list(data.columns),
+              "categories": {}, "masked": []}
+
+    def save(name, array):
+        _save_npy(os.path.join(columns_dir, name + ".npy"), array)
+
+    for col in data.columns:
+        values = data[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            layout["categories"][col] = [str(c) for c in values.cat.categories]
+            save(col, values.cat.codes.to_numpy())
+        elif isinstance(values.dtype, pd.api.extensions.ExtensionDtype):
+            layout["masked"].append(col)
+            save(col, values.to_numpy(dtype=values.dtype.numpy_dtype, na_value=0))
+            save(col + ".mask", values.isna().to_numpy())
+        else:
+            save(col, values.to_numpy())
+
+    # columns.json 最后写，它在就说明所有列都已写完
+    _dump_json(os.path.join(columns_dir, "columns.json"), layout)
+    return layout
+
+
+def derived_arrays(csv_path, name, build):
+    """加载时由数据算出来的数组（索引、打包的经纬度等），存在 .columns/<name>/ 下，以内存映射打开。
+
+    build() 返回 {名字: 数组}。CSV 的哈希或缓存版本变了就重新 build；缓存目录不可写时直接返回 build() 的结果。
+    """
+    folder = os.path.join(_columns_dir(csv_path), name)
+    layout_path = os.path.join(folder, "arrays.json")
+    sha256 = cached_sha256(csv_path)
+    layout = _read_meta(layout_path)
+    if not (sha256 and layout and layout.get("sha256") == sha256 and layout.get("version") == CACHE_VERSION):
+        arrays = build()
+        if not sha256:
+            return arrays
+        try:
+            os.makedirs(folder, exist_ok=True)
+            for key, array in arrays.items():
+                _save_npy(os.path.join(folder, key + ".npy"), array)
+            layout = {"version": CACHE_VERSION, "sha256": sha256, "arrays": list(arrays)}
+            # arrays.json 最后写，它在就说明所有数组都已写完
+            _dump_json(layout_path, layout)
+        except OSError:
+            return arrays
+    return {key: np.load(os.path.join(folder, key + ".npy"), mmap_mode="r") for key in layout["arrays"]}
+
+
+def open_columns(csv_path):
+    columns_dir = _columns_dir(csv_path)
+    layout = _read_meta(os.path.join(columns_dir, "columns.json"))
+    arrays = {}
+    for col in layout["columns"]:
+        values = np.load(os.path.join(columns_dir, col + ".npy"), mmap_mode="r")
+        if col in layout["categories"]:
+            values = pd.Categorical.from_codes(values, layout["categories"][col])
+        elif col in layout["masked"]:
+            mask = np.load(os.path.join(columns_dir, col + ".mask.npy"), mmap_mode="r")
+            values = pd.arrays.IntegerArray(values, mask)
+        arrays[col] = values
+    # copy=False：DataFrame 直接引用只读的内存映射，不复制
+    return pd.DataFrame(arrays, copy=False)
+
+
+def load_housing_mmap(csv_path="housing.csv"):
+    _, _, meta_path = _cache_paths(csv_path)
+    meta = _read_meta(meta_path)
+    layout = _read_meta(os.path.join(_columns_dir(csv_path), "columns.json"))
+    if not (cache_is_fresh(csv_path, meta, meta_path) and layout and layout.get("sha256") == meta["sha256"]
+            and layout.get("version") == CACHE_VERSION):
+        data = load_housing(csv_path)
+        meta = _read_meta(meta_path)
+        if meta is None:
+            # 缓存目录不可写，只能用进程内的副本
+            return data
+        write_columns(csv_path, data, meta["sha256"])
+    return open_columns(csv_path)
+
+
+def load_housing(csv_path="housing.csv", mmap=False):
+    if mmap:
+        return load_housing_mmap(csv_path)
+    _, feather_path, meta_path = _cache_paths(csv_path)
+    meta = _read_meta(meta_path)
+    if os.path.exists(feather_path) and cache_is_fresh(csv_path, meta, meta_path):
+        try:
+            return pd.read_feather(feather_path)
+        except (ImportError, OSError, ValueError):
+            pass
+
+    # 缓存不存在或已过期：回退到 CSV，按 schema 转换类型、按 Hilbert 曲线排序，并尽量重建缓存
+    source = source_stat(csv_path)
+    data = apply_schema(pd.read_csv(csv_path))
+    categories = [str(name) for name in data["ocean_proximity"].dropna().unique()]
+    data = spatial_sort(data)
+    try:
+        write_cache(csv_path, data, source, categories)
+    except (ImportError, OSError, ValueError):
+        # 没有 pyarrow 或目录只读时只是少了缓存，不影响使用
+        pass
+    return data
+
+
+def _update_stats(stats, chunk):
+    # 侧边栏需要的统计：类别（按出现顺序）以及每个 收入档 x 类别 的房价上下限
+    stats["rows"] += len(chunk)
+    for name in chunk["ocean_proximity"].unique():
+        if name not in stats["categories"]:
+            stats["categories"].append(str(name))
+    bands = income_bands(chunk["median_income"].to_numpy())
+    groups = chunk["median_house_value"].groupby([bands, chunk["ocean_proximity"]], observed=True).agg(["min", "max"])
+    for (band, name), (low, high) in groups.iterrows():
+        ranges = stats["price_range"].setdefault(INCOME_LEVELS[band], {})
+        old = ranges.get(name, (low, high))
+        ranges[name] = [int(min(old[0], low)), int(max(old[1], high))]
+
+
+def _store_paths(csv_path):
+    return cache_file(csv_path, ".parquet"), cache_file(csv_path, ".store.json")
+
+
+def ingest_csv(csv_path, chunksize=500_000):
+    """分块读取 CSV，逐块按 schema 转换、排序后追加到 Parquet，同时增量统计。"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    store_path, store_meta_path = _store_paths(csv_path)
+    os.makedirs(os.path.dirname(store_path), exist_ok=True)
+    stats = {"rows": 0, "categories": [], "price_range": {}}
+    source = source_stat(csv_path)
+
+    def write(p):
+        writer = None
+        try:
+            for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+                typed = apply_schema(chunk)
+                _update_stats(stats, typed)
+                order = np.lexsort((
+                    hilbert_key(typed["longitude"].to_numpy(), typed["latitude"].to_numpy()),
+                    income_bands(typed["median_income"].to_numpy()),
+                    typed["ocean_proximity"].cat.codes.to_numpy(),
+                ))
+                typed = typed.take(order).reset_index(drop=True)
+                table = pa.Table.from_pandas(typed, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(p, table.schema)
+                writer.write_table(table, row_group_size=ROW_GROUP_SIZE)
+        finally:
+            if writer is not None:
+                writer.close()
+
+    _write_atomic(store_path, write)
+    _write_meta(csv_path, store_meta_path, source, stats["rows"], stats=stats)
+    return stats
+
+
+def open_store(csv_path, chunksize=500_000):
+    """返回 (Parquet 路径, 统计)；CSV 变了就重新导入。"""
+    store_path, store_meta_path = _store_paths(csv_path)
+    meta = _read_meta(store_meta_path)
+    if os.path.exists(store_path) and cache_is_fresh(csv_path, meta, store_meta_path):
+        return store_path, meta["stats"]
+    return store_path, ingest_csv(csv_path, chunksize)
+
+
+def slider_bounds(stats, income_level, locations):
+    """由导入时的统计直接得到价格滑块的上下限，不用扫数据。"""
+    ranges = [stats["price_range"].get(income_level, {}).get(name) for name in locations]
+    ranges = [r for r in ranges if r]
+    if not ranges:
+        return None
+    return min(r[0] for r in ranges), max(r[1] for r in ranges)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    path = args[0] if args else "housing.csv"
+    start = time.perf_counter()
+    if "--ingest" in sys.argv:
+        summary = ingest_csv(path)
+        print(json.dumps(summary, indent=2))
+        print("ingested %d rows in %.1f ms" % (summary["rows"], (time.perf_counter() - start) * 1000))
+    else:
+        frame = load_housing(path, mmap="--mmap" in sys.argv)
+        print("loaded %d rows in %.1f ms" % (len(frame), (time.perf_counter() - start) * 1000))
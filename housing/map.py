@@ -0,0 +1,213 @@
+"""PyDeck 地图：逐点的散点图，或者在服务端按网格聚合后只发送格子。
+
+"Points (binary)" 模式不经过 pydeck 的 JSON：经纬度打包成 float32 的二进制数组，
+通过自定义组件（components/binary_points）直接交给 deck.gl 作为 attribute。
+数据在内存里时，全量点只在组件加载时发送一次，之后换筛选条件只发一个位图掩码（masked_scatter）。
+"Points (viewport)" 在此基础上只发送视野附近的点；用户平移/缩放出了已发送的范围，组件回报新的视野，
+下一次 rerun 再按新视野取点。
+逐点的几种模式点数超过 MAP_POINT_BUDGET 时，按格子分层抽样，密度和孤立的点都保留。
+pydeck 在第一次生成 Deck 时才导入，不画地图的页面不加载它。
+"""
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit.components.v1 as components
+
+from housing.spatial import expand_bounds, stratified_sample
+from housing.tiles import view_bounds
+
+MAP_STYLE = "mapbox://styles/mapbox/light-v9"
+MAP_MODES = ("Points", "Points (binary)", "Points (viewport)", "Aggregated", "Tiles")
+# 每个 256px 的地图瓦片划分成 8x8 个格子，格子在屏幕上大约 32px
+CELLS_PER_TILE = 8
+METERS_PER_DEGREE = 111320
+# 逐点模式下地图最多画多少个点，HOUSING_MAP_POINTS 可以覆盖
+MAP_POINT_BUDGET = 50_000
+# 全量点不超过这个数时，"Points (binary)" 只发一次全量点，之后只发掩码
+MAP_BASE_LIMIT = 1_000_000
+# 视野模式下，发送范围在视野四边各多出半个视野的宽/高，小范围平移不用 rerun
+VIEWPORT_MARGIN = 0.5
+
+_binary_points = components.declare_component(
+    "binary_points", path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "components", "binary_points"))
+
+
+def cell_size(zoom):
+    # 当前缩放级别下一个格子的边长（经纬度）
+    return 360.0 / (2 ** zoom) / CELLS_PER_TILE
+
+
+def aggregate_grid(lon, lat, values, size):
+    """把点按 size 度的方格分组，返回每格的点数、质心和平均房价。"""
+    if not len(lon):
+        return pd.DataFrame({"longitude": [], "latitude": [], "count": [], "mean_value": []})
+    ix = np.floor(lon / size).astype(np.int64)
+    iy = np.floor(lat / size).astype(np.int64)
+    keys = (ix - ix.min()) * (iy.max() - iy.min() + 1) + (iy - iy.min())
+    _, inverse = np.unique(keys, return_inverse=True)
+    count = np.bincount(inverse)
+
+    def mean(v):
+        return (np.bincount(inverse, weights=v) / count).astype(np.float32)
+
+    return pd.DataFrame({
+        "longitude": mean(lon),
+        "latitude": mean(lat),
+        "count": count.astype(np.int32),
+        "mean_value": mean(values),
+    })
+
+
+def view_state(center, zoom, pitch=0):
+    # center 由调用方给出（筛选结果的中心，空结果时是全量数据的中心）；画出来的行可能为空，不能取它们的均值
+    import pydeck as pdk
+
+    return pdk.ViewState(
+        latitude=float(center[1]),
+        longitude=float(center[0]),
+        zoom=zoom,
+        pitch=pitch,
+    )
+
+
+def scatter_deck(points, center, zoom=10):
+    import pydeck as pdk
+
+    return pdk.Deck(
+        map_style=MAP_STYLE,
+        initial_view_state=view_state(center, zoom, pitch=0),  # 平面视角
+        layers=[
+            pdk.Layer(
+                'ScatterplotLayer',  # 使用ScatterplotLayer绘制点图
+                data=points,
+                get_position='[longitude, latitude]',
+                get_radius=2000,  # 半径
+                get_fill_color=[255, 0, 0, 60],  # 使用RGBA设置颜色 (60表示透明度)
+                pickable=True
+            ),
+        ],
+    )
+
+
+def grid_deck(cells, size, center, zoom=10):
+    import pydeck as pdk
+
+    # 格子半径换算成米，略小于半个格子，柱子之间留一点缝
+    latitude = np.radians(center[1])
+    radius = size * METERS_PER_DEGREE * np.cos(latitude) * 0.45
+    return pdk.Deck(
+        map_style=MAP_STYLE,
+        initial_view_state=view_state(center, zoom, pitch=40),
+        layers=[
+            pdk.Layer(
+                'ColumnLayer',  # 每个格子一根柱子：高度是点数，颜色是平均房价
+                data=cells,
+                get_position='[longitude, latitude]',
+                get_elevation='count',
+                elevation_scale=radius / 10,
+                radius=radius,
+                disk_resolution=6,
+                extruded=True,
+                get_fill_color='[255, 255 * (1 - mean_value / 500001), 0, 160]',
+                pickable=True,
+            ),
+        ],
+        tooltip={"text": "{count} block groups\nmean price {mean_value}"},
+    )
+
+
+def pack_points(lon, lat):
+    # 交错排列的 [lon0, lat0, lon1, lat1, ...]，每个点 8 字节
+    positions = np.empty((len(lon), 2), dtype=np.float32)
+    positions[:, 0] = lon
+    positions[:, 1] = lat
+    return positions.tobytes()
+
+
+def sample_points(selection, budget=MAP_POINT_BUDGET):
+    """筛选结果超过 budget 个点时分层抽样，否则原样返回。"""
+    if len(selection) <= budget:
+        return selection
+    return selection.take(stratified_sample(selection.column("longitude"), selection.column("latitude"), budget))
+
+
+def sample_caption(shown, total):
+    # 格子边长随点的分布和 budget 变化（见 stratified_sample），这里不写具体数值
+    return "Showing %d of %d points (%.1f%%), sampled per grid cell" % (shown, total, 100.0 * shown / total)
+
+
+def initial_view(center, zoom):
+    # 组件的初始视野，和 view_state 一样由调用方给中心
+    return {"longitude": float(center[0]), "latitude": float(center[1]), "zoom": zoom, "pitch": 0}
+
+
+def viewport(state, center, zoom, margin=VIEWPORT_MARGIN):
+    """返回 (初始视野, 要发送的范围)。
+
+    state 是组件上次回报的值；回报之后缩放滑块没动过就沿用回报的视野，否则按数据中心和滑块的缩放级别算。
+    """
+    if state and state.get("view_id") == zoom:
+        return state["view"], expand_bounds(state["bounds"], margin)
+    view = initial_view(center, zoom)
+    return view, expand_bounds(view_bounds(center[0], center[1], zoom), margin)
+
+
+def binary_scatter(lon, lat, center, zoom=10, colors=None, radii=None, height=500, key=None, view=None, covered=None):
+    """colors 是每点 RGBA 的 uint8 数组 (n, 4)，radii 是每点半径（米）；不给就用和散点图一样的固定值。
+    view 不给时以 center 为中心。
+
+    给了 covered（发送的点覆盖的范围）时，视野移出它后组件回报新的视野，作为返回值和 st.session_state[key]。
+    """
+    if view is None:
+        view = initial_view(center, zoom)
+    return _binary_points(
+        positions=pack_points(lon, lat),
+        count=len(lon),
+        colors=None if colors is None else np.ascontiguousarray(colors, dtype=np.uint8).tobytes(),
+        radii=None if radii is None else np.ascontiguousarray(radii, dtype=np.float32).tobytes(),
+        fill_color=[255, 0, 0, 60],
+        radius=2000,
+        view=view,
+        view_id=zoom,
+        covered=None if covered is None else [float(b) for b in covered],
+        height=height,
+        key=key,
+        default=None,
+    )
+
+
+def base_points(positions):
+    """positions 是 pack_points 的结果（bytes，或者以内存映射打开的同样内容的 uint8 数组）；
+    version 是内容的哈希，组件据此判断手上的那份是不是最新的。"""
+    version = hashlib.sha1(positions).hexdigest()[:16]
+    return {"positions": positions, "count": len(positions) // 8, "version": version}
+
+
+def masked_scatter(base, rows, center, state, zoom=10, height=500, key=None):
+    """base 是 base_points 的结果，rows 是要显示的点在其中的行号。
+
+    组件回报的 base_version（在 state 里）和 base 一致时不再发送经纬度，只发 rows 对应的位图掩码；
+    deck.gl 用 DataFilterExtension 在 GPU 上过滤，图层 id 不变，位置缓冲区不重新上传。
+    """
+    mask = np.zeros(base["count"], dtype=bool)
+    mask[rows] = True
+    has_base = bool(state) and state.get("base_version") == base["version"]
+    return _binary_points(
+        # 组件参数只接受 bytes：内存映射的数组只在需要发送时复制一份
+        positions=None if has_base else bytes(base["positions"]),
+        base_version=base["version"],
+        count=base["count"],
+        mask=np.packbits(mask, bitorder="little").tobytes(),
+        colors=None,
+        radii=None,
+        fill_color=[255, 0, 0, 60],
+        radius=2000,
+        view=initial_view(center, zoom),
+        view_id=zoom,
+        covered=None,
+        height=height,
+        key=key,
+        default=None,
+    )
@@ -0,0 +1,89 @@
+"""每次 rerun 的分阶段计时。
+
+Profiler 放在 st.cache_resource 里，进程内所有会话共用，每个阶段保留最近 window 次耗时，
+用来算 p50/p95/p99；每次 rerun 结束再写一行 JSON 日志（logger "housing.profile"）。
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("housing.profile")
+
+
+def configure_logging(target=None):
+    """HOUSING_PROFILE_LOG=stderr 或文件路径时输出结构化日志；默认不输出。"""
+    target = target or os.environ.get("HOUSING_PROFILE_LOG")
+    if not target or logger.handlers:
+        return
+    handler = logging.StreamHandler(sys.stderr) if target == "stderr" else logging.FileHandler(target)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+class Profiler:
+    def __init__(self, window=1000):
+        self.window = window
+        self.reruns = 0
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+        self._counts = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def rerun(self, **context):
+        return Rerun(self, context)
+
+    def record(self, stages):
+        with self._lock:
+            self.reruns += 1
+            for name, ms in stages.items():
+                self._samples[name].append(ms)
+                self._counts[name] += 1
+
+    def summary(self):
+        """每个阶段的次数和耗时分位数（毫秒），按 p50 从大到小排。"""
+        with self._lock:
+            samples = {name: np.array(values) for name, values in self._samples.items()}
+            counts = dict(self._counts)
+        rows = []
+        for name, values in samples.items():
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            rows.append({"stage": name, "count": counts[name], "p50_ms": p50, "p95_ms": p95,
+                         "p99_ms": p99, "max_ms": values.max()})
+        columns = ["stage", "count", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+        return pd.DataFrame(rows, columns=columns).sort_values("p50_ms", ascending=False, ignore_index=True)
+
+
+class Rerun:
+    def __init__(self, profiler, context):
+        self.profiler = profiler
+        self.context = context
+        self.stages = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def finish(self):
+        total = (time.perf_counter() - self._start) * 1000
+        stages = dict(self.stages, total=total)
+        self.profiler.record(stages)
+        if logger.isEnabledFor(logging.INFO):
+            record = {"event": "rerun", "ts": time.time(), "pid": os.getpid()}
+            record.update(self.context)
+            record["stages_ms"] = {name: round(ms, 3) for name, ms in stages.items()}
+            logger.info(json.dumps(record, default=str))
+        return stages
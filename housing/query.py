@@ -0,0 +1,211 @@
+"""侧边栏筛选的查询层：app 只描述条件（收入档、位置类型、价格区间），怎么扫由引擎决定。
+
+MemoryEngine 用内存里的位图索引、有序价格索引和经纬度网格，结果是行号；
+ParquetEngine 面向 ingest_csv 导入的 Parquet，先用每个 row group 的 min/max 统计跳过不可能匹配的块，
+再只读需要的列，数据比内存大时也能用；块内按 Hilbert 曲线排序，按经纬度范围（bbox）查询也能跳过大部分块。
+"""
+import numpy as np
+import pandas as pd
+
+from housing.charts import histogram_counts, price_bins
+from housing.data import derived_arrays, load_housing, open_store, slider_bounds, source_categories
+from housing.filters import BitmapIndex, PriceIndex, column, income_mask, take
+from housing.schema import SCHEMA
+from housing.spatial import GridIndex
+
+POINT_COLUMNS = ("longitude", "latitude", "median_house_value")
+# 判断 row group 能否跳过用的收入区间（闭区间，宽一点没关系，逐行筛选时再精确判断）
+INCOME_RANGES = {"Low": (-np.inf, 2.5), "Medium": (2.5, 4.5), "High": (4.5, np.inf)}
+
+
+class Selection:
+    """筛选结果：内存引擎下是全量数据加行号，Parquet 引擎下是读出来的几列。"""
+
+    def __init__(self, data, rows=None, bins=None):
+        self.data = data
+        self.rows = rows
+        self.bins = bins
+
+    def __len__(self):
+        return len(self.data) if self.rows is None else len(self.rows)
+
+    @property
+    def nbytes(self):
+        # 内存引擎下数据是共享的，只算行号
+        if self.rows is not None:
+            return self.rows.nbytes
+        return int(np.sum(self.data.memory_usage(deep=True)))
+
+    def column(self, name):
+        if self.rows is None:
+            return self.data[name].to_numpy()
+        return column(self.data, name, self.rows)
+
+    def frame(self, columns):
+        if self.rows is None:
+            return self.data[list(columns)]
+        return take(self.data, self.rows, columns)
+
+    def take(self, positions):
+        """按位置取出其中一部分（比如地图上的抽样），结果仍是 Selection。"""
+        if self.rows is None:
+            return Selection(self.data.iloc[positions].reset_index(drop=True))
+        return Selection(self.data, self.rows[positions], self.bins)
+
+    def histogram_counts(self):
+        if self.rows is None:
+            bins = price_bins(self.data["median_house_value"].to_numpy())
+            return histogram_counts(bins, slice(None))
+        return histogram_counts(self.bins, self.rows)
+
+
+class MemoryEngine:
+    in_memory = True
+
+    def __init__(self, data, persist=None, categories=None):
+        """persist(name, build) 返回 build() 算出的派生数组；mmap 模式下它把数组存进缓存目录并以内存映射打开，
+        各进程共享，不再各自在堆上建一份索引。
+
+        categories 是侧边栏选项的顺序（CSV 里第一次出现的顺序，和 ParquetEngine 一致）；
+        不给时按 schema 里的顺序列出数据里有的类别。数据按 Hilbert 曲线排过序，不能用 unique() 的顺序。
+        """
+        self.data = data
+        self.persist = persist or (lambda name, build: build())
+        if categories is None:
+            present = set(data["ocean_proximity"].unique())
+            categories = [name for name in data["ocean_proximity"].cat.categories if name in present]
+        self.categories = list(categories)
+        self.index = BitmapIndex(data, self.persist("bitmap", lambda: BitmapIndex(data).arrays))
+        self.price_index = PriceIndex(data, self.persist("price", lambda: PriceIndex(data).arrays))
+        lon, lat = data["longitude"].to_numpy(), data["latitude"].to_numpy()
+        self.grid = GridIndex(lon, lat, arrays=self.persist("grid", lambda: GridIndex(lon, lat).arrays))
+        # 全量数据的中心，筛选结果为空时地图以它为中心
+        self.center = (float(data["longitude"].mean()), float(data["latitude"].mean()))
+        # 每行房价所在的直方图分箱，加载时算一次
+        self.bins = self.persist("bins", lambda: {"bins": price_bins(data["median_house_value"].to_numpy())})["bins"]
+
+    @classmethod
+    def open(cls, csv_path, mmap=False):
+        data = load_housing(csv_path, mmap=mmap)
+        categories = source_categories(csv_path)
+        if not mmap:
+            return cls(data, categories=categories)
+        return cls(data, persist=lambda name, build: derived_arrays(csv_path, name, build), categories=categories)
+
+    def bounds(self, income_level, locations):
+        mask = self.index.mask(income_level, locations)
+        if not mask.any():
+            return None
+        return self.price_index.bounds(mask)
+
+    def select(self, income_level, locations, price_range=None, bbox=None):
+        mask = self.index.mask(income_level, locations)
+        if bbox is not None:
+            # 只要视野内的点：先从网格取出范围内的行，再在这些行上判断其余条件
+            rows = self.grid.rows(bbox)
+            rows = rows[mask[rows]]
+            if price_range is not None:
+                prices = column(self.data, "median_house_value", rows)
+                rows = rows[(prices >= price_range[0]) & (prices <= price_range[1])]
+        elif price_range is None:
+            rows = np.flatnonzero(mask)
+        else:
+            rows = self.price_index.rows(price_range[0], price_range[1], mask=mask)
+        return Selection(self.data, rows, self.bins)
+
+
+def _column_ranges(metadata, index):
+    # 每个 row group 某一列的 (min, max)；没有统计信息的记为 None，不参与跳过
+    ranges = []
+    for i in range(metadata.num_row_groups):
+        stats = metadata.row_group(i).column(index).statistics
+        ranges.append((stats.min, stats.max) if stats is not None and stats.has_min_max else None)
+    return ranges
+
+
+def _midpoint(ranges):
+    known = [r for r in ranges if r is not None]
+    if not known:
+        return 0.0
+    return (min(low for low, _ in known) + max(high for _, high in known)) / 2
+
+
+class ParquetEngine:
+    in_memory = False
+
+    def __init__(self, path, stats):
+        import pyarrow.parquet as pq
+
+        self.file = pq.ParquetFile(path)
+        self.stats = stats
+        self.categories = list(stats["categories"])
+        names = self.file.schema_arrow.names
+        metadata = self.file.metadata
+        self._ranges = {name: _column_ranges(metadata, names.index(name))
+                        for name in ("median_income", "median_house_value", "ocean_proximity", "longitude", "latitude")}
+        # 全量数据的中心：不读数据，取各 row group 经纬度范围合起来的中点
+        self.center = tuple(_midpoint(self._ranges[name]) for name in ("longitude", "latitude"))
+
+    @classmethod
+    def open(cls, csv_path):
+        """CSV 没变就直接用已有的 Parquet，否则先分块导入。"""
+        return cls(*open_store(csv_path))
+
+    def bounds(self, income_level, locations):
+        return slider_bounds(self.stats, income_level, locations)
+
+    def row_groups(self, income_level, locations, price_range=None, bbox=None):
+        """按 row group 的 min/max 统计，返回可能有匹配行的 row group 编号；bbox 是 (西, 南, 东, 北)。"""
+        low, high = INCOME_RANGES[income_level]
+        names = [str(name) for name in locations]
+        groups = []
+        for i in range(self.file.metadata.num_row_groups):
+            income = self._ranges["median_income"][i]
+            if income is not None and (income[1] < low or income[0] > high):
+                continue
+            location = self._ranges["ocean_proximity"][i]
+            if location is not None and not any(location[0] <= name <= location[1] for name in names):
+                continue
+            price = self._ranges["median_house_value"][i]
+            if price_range is not None and price is not None and (
+                    price[1] < price_range[0] or price[0] > price_range[1]):
+                continue
+            if bbox is not None and not self._overlaps(i, bbox):
+                continue
+            groups.append(i)
+        return groups
+
+    def _overlaps(self, i, bbox):
+        lon, lat = self._ranges["longitude"][i], self._ranges["latitude"][i]
+        if lon is not None and (lon[1] < bbox[0] or lon[0] > bbox[2]):
+            return False
+        return lat is None or not (lat[1] < bbox[1] or lat[0] > bbox[3])
+
+    def select(self, income_level, locations, price_range=None, columns=POINT_COLUMNS, bbox=None):
+        """逐个读取可能匹配的 row group（只读 columns 和筛选用到的列），精确筛选后拼起来。"""
+        needed = list(dict.fromkeys(list(columns) + ["median_income", "ocean_proximity", "median_house_value"]
+                                    + (["longitude", "latitude"] if bbox is not None else [])))
+        parts = []
+        for i in self.row_groups(income_level, locations, price_range, bbox):
+            chunk = self.file.read_row_group(i, columns=needed).to_pandas()
+            mask = income_mask(chunk["median_income"].to_numpy(), income_level)
+            mask &= chunk["ocean_proximity"].isin(locations).to_numpy()
+            if price_range is not None:
+                prices = chunk["median_house_value"].to_numpy()
+                mask &= (prices >= price_range[0]) & (prices <= price_range[1])
+            if bbox is not None:
+                lon, lat = chunk["longitude"].to_numpy(), chunk["latitude"].to_numpy()
+                mask &= (lon >= bbox[0]) & (lon <= bbox[2]) & (lat >= bbox[1]) & (lat <= bbox[3])
+            parts.append(chunk.loc[mask, list(columns)])
+        if parts:
+            frame = pd.concat(parts, ignore_index=True)
+        else:
+            frame = pd.DataFrame({name: pd.Series(dtype=SCHEMA[name]) for name in columns})
+        return Selection(frame)
+
+
+def open_engine(csv_path, store=None, mmap=False):
+    """store="parquet" 时走 ParquetEngine，否则把数据读进内存。"""
+    if store == "parquet":
+        return ParquetEngine.open(csv_path)
+    return MemoryEngine.open(csv_path, mmap=mmap)
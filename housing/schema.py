@@ -0,0 +1,85 @@
+"""housing 数据的列类型：两个 app 和缓存都用这一份 schema。
+
+pandas 默认把数值列都推断成 float64、ocean_proximity 推断成字符串；
+这里统一成更紧凑的类型，并在转换前做校验，数据不符合就抛 SchemaError。
+"""
+import numpy as np
+import pandas as pd
+
+OCEAN_PROXIMITY = ("<1H OCEAN", "INLAND", "ISLAND", "NEAR BAY", "NEAR OCEAN")
+
+# 列名 -> 类型；"Int32" 是带缺失值掩码的可空整数（total_bedrooms 有缺失）
+SCHEMA = {
+    "longitude": "float32",
+    "latitude": "float32",
+    "housing_median_age": "int16",
+    "total_rooms": "int32",
+    "total_bedrooms": "Int32",
+    "population": "int32",
+    "households": "int32",
+    "median_income": "float32",
+    "median_house_value": "int32",
+    "ocean_proximity": pd.CategoricalDtype(list(OCEAN_PROXIMITY)),
+}
+
+
+class SchemaError(ValueError):
+    pass
+
+
+def _check_integral(name, values, dtype):
+    values = values[~np.isnan(values)]
+    if not np.array_equal(values, np.round(values)):
+        raise SchemaError("column %r has non-integer values" % name)
+    info = np.iinfo(np.dtype(dtype.lower()))
+    if len(values) and (values.min() < info.min or values.max() > info.max):
+        raise SchemaError("column %r does not fit in %s" % (name, dtype))
+
+
+def apply_schema(raw):
+    missing = [name for name in SCHEMA if name not in raw.columns]
+    if missing:
+        raise SchemaError("missing columns: %s" % ", ".join(missing))
+
+    typed = {}
+    for name, dtype in SCHEMA.items():
+        values = raw[name]
+        if isinstance(dtype, pd.CategoricalDtype):
+            unknown = set(values.dropna().unique()) - set(dtype.categories)
+            if unknown or values.isna().any():
+                raise SchemaError("column %r has unknown categories: %s" % (name, sorted(map(str, unknown))))
+            typed[name] = values.astype(dtype)
+            continue
+
+        array = values.to_numpy(dtype="float64", na_value=np.nan)
+        if np.isnan(array).any() and dtype != "Int32":
+            raise SchemaError("column %r has missing values" % name)
+        if dtype.lower().startswith("int"):
+            _check_integral(name, array, dtype)
+        typed[name] = values.astype(dtype)
+    return pd.DataFrame(typed)
+
+
+def memory_report(raw, typed):
+    """每列转换前后占用的字节数，最后一行是合计。"""
+    before = raw.memory_usage(index=False, deep=True)
+    after = typed.memory_usage(index=False, deep=True)
+    report = pd.DataFrame({
+        "before": before,
+        "after": after.reindex(before.index),
+        "dtype": typed.dtypes.astype(str).reindex(before.index),
+    })
+    report.loc["total"] = [before.sum(), after.sum(), ""]
+    report["saved"] = report["before"] - report["after"]
+    return report
+
+
+if __name__ == "__main__":
+    import sys
+
+    raw_data = pd.read_csv(sys.argv[1] if len(sys.argv) > 1 else "housing.csv")
+    typed_data = apply_schema(raw_data)
+    result = memory_report(raw_data, typed_data)
+    print(result.to_string())
+    total = result.loc["total"]
+    print("saved %d of %d bytes (%.0f%%)" % (total["saved"], total["before"], 100 * total["saved"] / total["before"]))
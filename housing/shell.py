@@ -0,0 +1,64 @@
+"""页面外壳（Bootstrap 标题和卡片）做成自定义组件：iframe 每个会话只加载一次。
+
+组件的 HTML 和样式都是本地文件（components/page_shell），Bootstrap 的 CSS 放在 vendor/ 下、
+文件名带内容哈希，不再依赖外部 CDN。之后的 rerun 只发送很小的数据（筛选摘要、直方图的 30 个计数、
+粗网格的点数），由组件在卡片里画出来；在直方图上点一根柱子，组件把那一段价格回报给 Python。
+"""
+import os
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from housing.map import aggregate_grid
+
+# 卡片里的地图缩略图用的格子边长（度）
+PREVIEW_CELL = 0.5
+
+_page_shell = components.declare_component(
+    "page_shell", path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "components", "page_shell"))
+
+
+def preview_cells(lon, lat, values, cell=PREVIEW_CELL):
+    """地图缩略图的数据：每个粗格子的 [经度, 纬度, 点数]。"""
+    cells = aggregate_grid(lon, lat, values, cell)
+    return [[round(float(x), 3), round(float(y), 3), int(n)]
+            for x, y, n in zip(cells["longitude"], cells["latitude"], cells["count"])]
+
+
+def page_shell(summary=None, histogram=None, edges=None, cells=None, height=1000, key="page_shell"):
+    """summary 是一行筛选摘要，histogram/edges 是直方图的计数和分箱边界，cells 来自 preview_cells。
+
+    返回组件回报的值：{"click": 每次点击不同的 id, "price_range": [低, 高] 或 None（点了 "show all"）}。
+    """
+    return _page_shell(
+        summary=summary,
+        histogram=None if histogram is None else [int(c) for c in histogram],
+        edges=None if edges is None else [float(e) for e in edges],
+        cells=cells,
+        height=height,
+        key=key,
+        default=None,
+    )
+
+
+def clicked_price_range(state, seen):
+    """组件回报了新的点击（click 和 seen 不同）时返回 (click, 价格区间)，否则返回 None。"""
+    if not state or state.get("click") == seen:
+        return None
+    return state["click"], state.get("price_range")
+
+
+def shell_price_default(sidebar_key, price_min, price_max, key="page_shell"):
+    """在外壳的直方图上点了一根柱子：把那一段价格作为滑块的默认值（只对当前的侧边栏组合有效）。
+
+    没点过、点了 "show all"、或者那一段和当前范围不相交时返回 None。
+    """
+    clicked = clicked_price_range(st.session_state.get(key), st.session_state.get(key + "_click"))
+    if clicked is not None:
+        st.session_state[key + "_click"] = clicked[0]
+        st.session_state[key + "_price"] = (sidebar_key, clicked[1])
+    stored = st.session_state.get(key + "_price")
+    if stored is None or stored[0] != sidebar_key or stored[1] is None:
+        return None
+    low, high = max(stored[1][0], price_min), min(stored[1][1], price_max)
+    return (low, high) if low <= high else None
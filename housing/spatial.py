@@ -0,0 +1,148 @@
+"""按 Hilbert 曲线给经纬度排序：地理上相邻的街区在存储里也尽量相邻。
+
+键只取决于经纬度本身（全球范围量化到 2^HILBERT_ORDER 格），和数据的范围无关，
+所以分块导入时各块算出来的键可以直接比较。
+
+GridIndex 是经纬度上的规则网格，按地图视野取点时只看视野内的格子；
+stratified_sample 在同样的格子上分层抽样，控制地图上的点数。
+"""
+import numpy as np
+
+HILBERT_ORDER = 16
+# GridIndex 的格子边长（度），约 5 km
+GRID_CELL = 0.05
+
+
+def hilbert_key(lon, lat, order=HILBERT_ORDER):
+    """经纬度在 Hilbert 曲线上的位置（uint64），曲线上相邻的格子在地图上也相邻。"""
+    n = 1 << order
+    x = np.clip(((np.asarray(lon, dtype=np.float64) + 180) / 360 * n).astype(np.int64), 0, n - 1)
+    y = np.clip(((np.asarray(lat, dtype=np.float64) + 90) / 180 * n).astype(np.int64), 0, n - 1)
+    key = np.zeros(len(x), dtype=np.uint64)
+    s = n >> 1
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        key += np.uint64(s * s) * ((3 * rx) ^ ry).astype(np.uint64)
+        # 旋转/翻转象限，让下一级的曲线与这一级首尾相接
+        flip = ~ry & rx
+        x = np.where(flip, n - 1 - x, x)
+        y = np.where(flip, n - 1 - y, y)
+        x, y = np.where(~ry, y, x), np.where(~ry, x, y)
+        s >>= 1
+    return key
+
+
+def spatial_order(data):
+    return np.argsort(hilbert_key(data["longitude"].to_numpy(), data["latitude"].to_numpy()), kind="stable")
+
+
+def spatial_sort(data):
+    """按 Hilbert 键重排行，索引重新从 0 开始。"""
+    return data.take(spatial_order(data)).reset_index(drop=True)
+
+
+def stratified_sample(lon, lat, budget, cell=GRID_CELL, seed=0):
+    """按格子分层抽样，返回抽中的位置（升序），个数不超过 budget。
+
+    每个有点的格子至少留一个点，孤立的点不会被抽掉；其余名额按格子里的点数成比例分配，密度分布不变。
+    有点的格子比 budget 还多时（比如全国范围的数据）格子边长加倍，直到格子数不超过 budget。
+    格子内随机抽，种子固定，同一组点每次抽到的一样。
+    """
+    n = len(lon)
+    if n <= budget:
+        return np.arange(n)
+    ix = np.floor(np.asarray(lon) / cell).astype(np.int64)
+    iy = np.floor(np.asarray(lat) / cell).astype(np.int64)
+    ix -= ix.min()
+    iy -= iy.min()
+    while True:
+        size = (ix.max() + 1) * (iy.max() + 1)
+        keys = ix * (iy.max() + 1) + iy
+        # 格子总数不大时用 bincount 数有点的格子，不用排序
+        occupied = np.count_nonzero(np.bincount(keys)) if size <= 4 * n else len(np.unique(keys))
+        if occupied <= max(budget, 1):
+            break
+        # 编号都从 0 开始，右移一位就是边长加倍的格子；最后总会只剩一个格子
+        ix >>= 1
+        iy >>= 1
+    # 格子编号加上 [0, 1) 的随机数一起排序：同一格的点排在一起，格内顺序随机
+    order = np.argsort(keys + np.random.default_rng(seed).random(n))
+    sorted_keys = keys[order]
+    first = np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1]))
+    cells = np.cumsum(first) - 1
+    starts = np.flatnonzero(first)
+    counts = np.diff(np.append(starts, n))
+
+    # 二分查找比例 scale，使每格 max(1, 点数 * scale) 的总和不超过 budget
+    def quotas(scale):
+        return np.minimum(counts, np.maximum(1, np.floor(counts * scale).astype(np.int64)))
+
+    low, high = 0.0, 1.0
+    for _ in range(40):
+        middle = (low + high) / 2
+        if quotas(middle).sum() <= budget:
+            low = middle
+        else:
+            high = middle
+
+    # 每格里排在配额以内的点留下
+    rank = np.arange(n) - starts[cells]
+    return np.sort(order[rank < quotas(low)[cells]])
+
+
+def expand_bounds(bounds, margin):
+    """(西, 南, 东, 北) 四边各向外扩 margin 倍的宽/高。"""
+    west, south, east, north = bounds
+    dx, dy = (east - west) * margin, (north - south) * margin
+    return west - dx, south - dy, east + dx, north + dy
+
+
+class GridIndex:
+    """按格子排好的行号（CSR）：同一列格子在排序后的键上是连续的一段，范围查询每列两次二分查找。"""
+
+    def __init__(self, lon, lat, cell=GRID_CELL, arrays=None):
+        """arrays 是同一组点、同样 cell 的另一个实例的 .arrays（比如以内存映射打开的缓存），给了就不再排序。"""
+        self.cell = cell
+        self.lon = np.asarray(lon)
+        self.lat = np.asarray(lat)
+        # floor 是单调的，格子编号的最小/最大值直接由经纬度的最小/最大值得到
+        if len(self.lon):
+            self.x0, self.y0 = int(np.floor(self.lon.min() / cell)), int(np.floor(self.lat.min() / cell))
+            self.nx = int(np.floor(self.lon.max() / cell)) - self.x0 + 1
+            self.ny = int(np.floor(self.lat.max() / cell)) - self.y0 + 1
+        else:
+            self.x0 = self.y0 = self.nx = self.ny = 0
+        if arrays is None:
+            ix = np.floor(self.lon / cell).astype(np.int64)
+            iy = np.floor(self.lat / cell).astype(np.int64)
+            keys = (ix - self.x0) * self.ny + (iy - self.y0)
+            # 稳定排序：格子内保持原来的（Hilbert）顺序
+            order = np.argsort(keys, kind="stable")
+            arrays = {"order": order, "keys": keys[order]}
+        self.order, self.keys = arrays["order"], arrays["keys"]
+
+    @property
+    def arrays(self):
+        return {"order": self.order, "keys": self.keys}
+
+    def rows(self, bounds):
+        """落在 (西, 南, 东, 北) 内的行号，升序。"""
+        west, south, east, north = bounds
+        # 边界不是有限值（比如空结果算出来的 NaN 中心）时没有行可取
+        if not np.all(np.isfinite(bounds)):
+            return np.empty(0, dtype=np.int64)
+        # 多取一圈格子：float32 的经纬度和 float64 的边界在格子边上可能落进相邻的格子
+        x_lo = max(int(np.floor(west / self.cell)) - self.x0 - 1, 0)
+        x_hi = min(int(np.floor(east / self.cell)) - self.x0 + 1, self.nx - 1)
+        y_lo = max(int(np.floor(south / self.cell)) - self.y0 - 1, 0)
+        y_hi = min(int(np.floor(north / self.cell)) - self.y0 + 1, self.ny - 1)
+        if x_lo > x_hi or y_lo > y_hi:
+            return np.empty(0, dtype=np.int64)
+        columns = np.arange(x_lo, x_hi + 1) * self.ny
+        starts = np.searchsorted(self.keys, columns + y_lo, side="left")
+        stops = np.searchsorted(self.keys, columns + y_hi, side="right")
+        rows = np.sort(np.concatenate([self.order[a:b] for a, b in zip(starts, stops)]))
+        # 边上的格子只有一部分在范围内，逐行再判断一次
+        lon, lat = self.lon[rows], self.lat[rows]
+        return rows[(lon >= west) & (lon <= east) & (lat >= south) & (lat <= north)]
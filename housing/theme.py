@@ -0,0 +1,30 @@
+"""页面的样式层：样式表是 static/housing.css，由 Streamlit 的静态文件服务提供。
+
+每次 rerun 只发送一行 <link>，样式表本身由浏览器缓存；链接带内容哈希（?v=），文件改了才重新下载。
+样式表不引用任何外部地址（原来滑块的小花背景图在外网上，已去掉）。
+没开 server.enableStaticServing 时退回内联 <style>。
+"""
+import hashlib
+import os
+
+import streamlit as st
+
+# Streamlit 的静态文件服务只认入口脚本旁边的 static/，样式表留在仓库根目录
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+STYLESHEET = "housing.css"
+
+
+def stylesheet_html(static_serving=None):
+    """页面里要插入的 HTML：静态文件服务可用时是 <link>，否则是内联的 <style>。"""
+    if static_serving is None:
+        static_serving = st.get_option("server.enableStaticServing")
+    with open(os.path.join(STATIC_DIR, STYLESHEET), "rb") as f:
+        css = f.read()
+    if not static_serving:
+        return "<style>\n%s</style>" % css.decode("utf-8")
+    version = hashlib.sha256(css).hexdigest()[:10]
+    return '<link rel="stylesheet" href="app/static/%s?v=%s">' % (STYLESHEET, version)
+
+
+if __name__ == "__main__":
+    print(stylesheet_html(static_serving=True))
@@ -0,0 +1,162 @@
+"""按缩放级别预先聚合的地图瓦片金字塔。
+
+每一级把 Web Mercator 瓦片再分成 8x8 个格子（与 housing.map.CELLS_PER_TILE 一致），
+按 (瓦片, 格子, 分组) 存点数和经度/纬度/房价之和，按瓦片排序，
+所以取视野里的瓦片只需要几次二分查找。
+
+分组是 收入档 x ocean_proximity，侧边栏的任意组合都能直接从金字塔里加出来；
+价格滑块不是全范围时，改用只含筛选后行的金字塔（按需建某一级，放在结果缓存里）。
+"""
+import numpy as np
+import pandas as pd
+
+from housing.data import derived_arrays
+from housing.filters import INCOME_LEVELS, income_bands
+
+TILE_ZOOMS = range(4, 15)
+CELL_BITS = 3
+TILE_SIZE = 256
+CELLS = 1 << (2 * CELL_BITS)
+CELL_MASK = (1 << CELL_BITS) - 1
+TILES_VERSION = 1
+_FIELDS = ("key", "count", "sum_lon", "sum_lat", "sum_value")
+
+
+def mercator(lon, lat, zoom):
+    # 经纬度 -> 该缩放级别下以瓦片为单位的坐标
+    n = 2.0 ** zoom
+    x = (np.asarray(lon, dtype=np.float64) + 180.0) / 360.0 * n
+    lat_rad = np.radians(np.clip(np.asarray(lat, dtype=np.float64), -85.0511, 85.0511))
+    y = (1.0 - np.log(np.tan(lat_rad) + 1.0 / np.cos(lat_rad)) / np.pi) / 2.0 * n
+    return x, y
+
+
+def _build_level(lon, lat, value, group, ngroups, zoom):
+    cx, cy = mercator(lon, lat, zoom + CELL_BITS)
+    cx = np.floor(cx).astype(np.int64)
+    cy = np.floor(cy).astype(np.int64)
+    tile = (cx >> CELL_BITS) * (1 << zoom) + (cy >> CELL_BITS)
+    cell = tile * CELLS + ((cx & CELL_MASK) << CELL_BITS) + (cy & CELL_MASK)
+    keys = cell * ngroups + (0 if group is None else group)
+    unique, inverse = np.unique(keys, return_inverse=True)
+    return {
+        "key": unique,
+        "count": np.bincount(inverse, minlength=len(unique)).astype(np.int32),
+        "sum_lon": np.bincount(inverse, weights=lon, minlength=len(unique)),
+        "sum_lat": np.bincount(inverse, weights=lat, minlength=len(unique)),
+        "sum_value": np.bincount(inverse, weights=value, minlength=len(unique)),
+    }
+
+
+def unmercator(x, y, zoom):
+    # mercator 的逆变换：瓦片坐标 -> 经纬度
+    n = 2.0 ** zoom
+    lon = np.asarray(x, dtype=np.float64) / n * 360.0 - 180.0
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1.0 - 2.0 * np.asarray(y, dtype=np.float64) / n))))
+    return lon, lat
+
+
+def view_bounds(longitude, latitude, zoom, width=1200, height=500):
+    """视野覆盖的经纬度范围 (西, 南, 东, 北)，与 deck.gl 的 viewport.getBounds() 一致。"""
+    cx, cy = mercator(longitude, latitude, zoom)
+    half_w, half_h = width / 2 / TILE_SIZE, height / 2 / TILE_SIZE
+    west, north = unmercator(cx - half_w, cy - half_h, zoom)
+    east, south = unmercator(cx + half_w, cy + half_h, zoom)
+    return float(west), float(south), float(east), float(north)
+
+
+def tiles_in_view(longitude, latitude, zoom, width=1200, height=500, margin=1):
+    """视野（地图中心 + 缩放级别 + 像素尺寸）覆盖的瓦片范围，外加 margin 圈瓦片。"""
+    cx, cy = mercator(longitude, latitude, zoom)
+    half_w, half_h = width / 2 / TILE_SIZE, height / 2 / TILE_SIZE
+    last = (1 << zoom) - 1
+    x0, x1 = int(np.floor(cx - half_w)) - margin, int(np.floor(cx + half_w)) + margin
+    y0, y1 = int(np.floor(cy - half_h)) - margin, int(np.floor(cy + half_h)) + margin
+    return max(x0, 0), min(x1, last), max(y0, 0), min(y1, last)
+
+
+class TilePyramid:
+    def __init__(self, levels=None, ngroups=1, source=None):
+        self.levels = dict(levels or {})
+        self.ngroups = ngroups
+        # (lon, lat, value, group)：缺少某一级时用它补建
+        self._source = source
+
+    @classmethod
+    def build(cls, lon, lat, value, group=None, ngroups=1, zooms=TILE_ZOOMS):
+        pyramid = cls(ngroups=ngroups, source=(lon, lat, value, group))
+        for zoom in zooms:
+            pyramid.level(zoom)
+        return pyramid
+
+    def level(self, zoom):
+        if zoom not in self.levels:
+            self.levels[zoom] = _build_level(*self._source, self.ngroups, zoom)
+        return self.levels[zoom]
+
+    def query(self, zoom, tiles, groups=None):
+        """取出 tiles=(x0, x1, y0, y1) 范围内的格子，groups 为 None 时不区分分组。"""
+        level = self.level(zoom)
+        x0, x1, y0, y1 = tiles
+        per_tile = CELLS * self.ngroups
+        # 同一列瓦片（同一个 x）的键是连续的，每列两次二分查找
+        starts = [(x * (1 << zoom) + y0) * per_tile for x in range(x0, x1 + 1)]
+        stops = [(x * (1 << zoom) + y1 + 1) * per_tile for x in range(x0, x1 + 1)]
+        lo = np.searchsorted(level["key"], starts)
+        hi = np.searchsorted(level["key"], stops)
+        picked = np.concatenate([np.arange(a, b) for a, b in zip(lo, hi)]) if len(lo) else np.array([], int)
+        if groups is not None:
+            picked = picked[np.isin(level["key"][picked] % self.ngroups, groups)]
+
+        cells, inverse = np.unique(level["key"][picked] // self.ngroups, return_inverse=True)
+
+        def total(field):
+            return np.bincount(inverse, weights=level[field][picked], minlength=len(cells))
+
+        count = total("count")
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return pd.DataFrame({
+                "longitude": (total("sum_lon") / count).astype(np.float32),
+                "latitude": (total("sum_lat") / count).astype(np.float32),
+                "count": count.astype(np.int32),
+                "mean_value": (total("sum_value") / count).astype(np.float32),
+            })
+
+    @property
+    def arrays(self):
+        # 各级的各个字段摊平成 {z<级>_<字段>: 数组}，用 derived_arrays 存盘
+        return {"z%d_%s" % (zoom, field): level[field] for zoom, level in self.levels.items() for field in _FIELDS}
+
+    @classmethod
+    def from_arrays(cls, arrays, ngroups=1):
+        levels = {}
+        for name, array in arrays.items():
+            zoom, field = name[1:].split("_", 1)
+            levels.setdefault(int(zoom), {})[field] = array
+        return cls(levels, ngroups=ngroups)
+
+
+def tile_groups(data):
+    # 每行的分组编号 = 收入档 * 类别数 + ocean_proximity 编码
+    categories = data["ocean_proximity"].cat.categories
+    codes = data["ocean_proximity"].cat.codes.to_numpy().astype(np.int64)
+    return income_bands(data["median_income"].to_numpy()) * len(categories) + codes, len(INCOME_LEVELS) * len(categories)
+
+
+def selected_groups(data, income_level, locations):
+    categories = list(data["ocean_proximity"].cat.categories)
+    band = INCOME_LEVELS.index(income_level)
+    return [band * len(categories) + categories.index(name) for name in locations if name in categories]
+
+
+def load_pyramid(csv_path, data):
+    """加载时建全量金字塔，和列式缓存放在一起（以内存映射打开，多个进程共享）；CSV 没变就直接读文件。"""
+    group, ngroups = tile_groups(data)
+
+    def build():
+        return TilePyramid.build(
+            data["longitude"].to_numpy(), data["latitude"].to_numpy(),
+            data["median_house_value"].to_numpy(), group, ngroups,
+        ).arrays
+
+    return TilePyramid.from_arrays(derived_arrays(csv_path, "tiles_v%d" % TILES_VERSION, build), ngroups)
@@ -0,0 +1,80 @@
+"""索引和逐行扫描的结果必须一致：侧边栏的每一种组合都比一遍。"""
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from housing.filters import INCOME_LEVELS, BitmapIndex, PriceIndex, filter_rows, income_mask
+from housing.schema import apply_schema
+
+CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "housing.csv")
+
+
+@pytest.fixture(scope="module")
+def data():
+    return apply_schema(pd.read_csv(CSV_PATH))
+
+
+def sidebar_states(data):
+    # 每个收入档 x 位置类型的每个子集（包括全不选）
+    categories = list(data["ocean_proximity"].cat.categories)
+    for level in INCOME_LEVELS:
+        for k in range(len(categories) + 1):
+            for locations in itertools.combinations(categories, k):
+                yield level, list(locations)
+
+
+def scan_mask(data, income_level, locations):
+    return (income_mask(data["median_income"].to_numpy(), income_level)
+            & data["ocean_proximity"].isin(locations).to_numpy())
+
+
+def test_bitmap_rows_match_scan(data):
+    index = BitmapIndex(data)
+    for level, locations in sidebar_states(data):
+        expected = np.flatnonzero(scan_mask(data, level, locations))
+        np.testing.assert_array_equal(filter_rows(data, level, locations), expected)
+        np.testing.assert_array_equal(index.rows(level, locations), expected)
+        np.testing.assert_array_equal(index.mask(level, locations), scan_mask(data, level, locations))
+
+
+def test_bitmap_from_arrays(data):
+    # mmap 模式下索引由缓存的 .arrays 重建，结果要和现建的一样
+    built = BitmapIndex(data)
+    loaded = BitmapIndex(data, {name: array.copy() for name, array in built.arrays.items()})
+    for level, locations in sidebar_states(data):
+        np.testing.assert_array_equal(loaded.rows(level, locations), built.rows(level, locations))
+
+
+def price_ranges(prices):
+    # 窄区间走有序索引，宽区间走扫描；再加上非整数边界、超出范围和空区间
+    values = np.sort(prices)
+    n = len(values)
+    for low_q, high_q in ((0, 0.001), (0.3, 0.31), (0.5, 0.55), (0.1, 0.9), (0, 1)):
+        yield int(values[int(low_q * (n - 1))]), int(values[int(high_q * (n - 1))])
+    yield 150000.5, 150999.5
+    yield -1, 10 ** 7
+    yield 300001, 300000
+    yield 10 ** 7, 10 ** 8
+
+
+def test_price_rows_match_scan(data):
+    index = PriceIndex(data)
+    prices = data["median_house_value"].to_numpy()
+    for low, high in price_ranges(prices):
+        in_range = (prices >= low) & (prices <= high)
+        np.testing.assert_array_equal(index.rows(low, high), np.flatnonzero(in_range))
+        for level, locations in sidebar_states(data):
+            mask = scan_mask(data, level, locations)
+            np.testing.assert_array_equal(index.rows(low, high, mask=mask), np.flatnonzero(in_range & mask))
+
+
+def test_price_bounds_match_scan(data):
+    index = PriceIndex(data)
+    prices = data["median_house_value"].to_numpy()
+    for level, locations in sidebar_states(data):
+        mask = scan_mask(data, level, locations)
+        if mask.any():
+            assert index.bounds(mask) == (prices[mask].min(), prices[mask].max())